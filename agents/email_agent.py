@@ -1,10 +1,16 @@
 import re
 import json
 import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional, Tuple
 import requests
 from agents.base_agent import BaseAgent
 
+# Header patterns, compiled once instead of looked up per email
+_FROM_RE = re.compile(r'From:\s*(.*?)(?:\n|$)')
+_SUBJECT_RE = re.compile(r'Subject:\s*(.*?)(?:\n|$)')
+_NAME_EMAIL_RE = re.compile(r'(.*?)\s*<([^>]+)>')
+_ADDRESS_RE = re.compile(r'[\w\.-]+@[\w\.-]+')
+
 class EmailParserAgent(BaseAgent):
     """
     Email Parser Agent that extracts structured fields from emails,
@@ -77,6 +83,22 @@ class EmailParserAgent(BaseAgent):
                 "not acceptable", "bad experience", "terrible", "awful"
             ]
         }
+        
+        # Lowercased once so each email only needs plain substring scans
+        self._high_urgency_keywords = frozenset(k.lower() for k in self.urgency_indicators["High"])
+        self._medium_urgency_keywords = frozenset(k.lower() for k in self.urgency_indicators["Medium"])
+        self._tone_keywords = {
+            tone: frozenset(k.lower() for k in indicators) for tone, indicators in self.tone_indicators.items()
+        }
+        self._issue_keywords = {
+            issue_type: frozenset(k.lower() for k in indicators) for issue_type, indicators in self.issue_types.items()
+        }
+        # Every keyword once, so an email is scanned for each word a single time
+        self._all_keywords = tuple(
+            self._high_urgency_keywords | self._medium_urgency_keywords
+            | frozenset().union(*self._tone_keywords.values())
+            | frozenset().union(*self._issue_keywords.values())
+        )
     
     def parse_email(self, email_content: str) -> Dict[str, Any]:
         """
@@ -93,10 +115,13 @@ class EmailParserAgent(BaseAgent):
         subject = self._extract_subject(email_content)
         body = self._extract_body(email_content)
         
-        # Extract or infer data from content
-        urgency = self._determine_urgency(subject, body)
-        tone = self._determine_tone(body)
-        issue_type = self._determine_issue_type(subject, body)
+        # Extract or infer data from content. The body is part of the combined
+        # text, so its keywords are a subset of the combined matches.
+        matched = self._match_keywords((subject + " " + body).lower())
+        body_matched = self._match_keywords(body.lower(), matched)
+        urgency = self._determine_urgency(subject, body, matched)
+        tone = self._determine_tone(body, body_matched)
+        issue_type = self._determine_issue_type(subject, body, matched)
         
         # Create structured email data
         email_data = {
@@ -118,21 +143,21 @@ class EmailParserAgent(BaseAgent):
     
     def _extract_sender(self, email_content: str) -> Tuple[str, str]:
         """Extract sender name and email from 'From' field."""
-        from_match = re.search(r'From:\s*(.*?)(?:\n|$)', email_content)
+        from_match = _FROM_RE.search(email_content)
         if not from_match:
             return "Unknown", "unknown@example.com"
         
         from_line = from_match.group(1).strip()
         
         # Try to extract email in format "Name <email@example.com>"
-        name_email_match = re.search(r'(.*?)\s*<([^>]+)>', from_line)
+        name_email_match = _NAME_EMAIL_RE.search(from_line)
         if name_email_match:
             name = name_email_match.group(1).strip()
             email = name_email_match.group(2).strip()
             return name, email
         
         # If plain email address
-        email_match = re.search(r'[\w\.-]+@[\w\.-]+', from_line)
+        email_match = _ADDRESS_RE.search(from_line)
         if email_match:
             email = email_match.group(0)
             name = from_line.replace(email, '').strip()
@@ -145,7 +170,7 @@ class EmailParserAgent(BaseAgent):
     
     def _extract_subject(self, email_content: str) -> str:
         """Extract email subject."""
-        subject_match = re.search(r'Subject:\s*(.*?)(?:\n|$)', email_content)
+        subject_match = _SUBJECT_RE.search(email_content)
         if subject_match:
             return subject_match.group(1).strip()
         return "No Subject"
@@ -167,41 +192,52 @@ class EmailParserAgent(BaseAgent):
         # If we can't determine where body starts, return original content
         return email_content.strip()
     
-    def _determine_urgency(self, subject: str, body: str) -> str:
+    def _match_keywords(self, text: str, candidates: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+        """
+        Find which known keywords occur in already-lowercased text.
+        
+        Args:
+            text: Lowercased text to scan
+            candidates: Keywords to try; defaults to every known keyword
+            
+        Returns:
+            Set of keywords found in the text
+        """
+        if candidates is None:
+            candidates = self._all_keywords
+        return frozenset(keyword for keyword in candidates if keyword in text)
+    
+    def _determine_urgency(self, subject: str, body: str, matched: Optional[FrozenSet[str]] = None) -> str:
         """
         Determine email urgency based on keywords in subject and body.
         Returns: "High", "Medium", or "Low"
         """
-        combined_text = (subject + " " + body).lower()
+        if matched is None:
+            matched = self._match_keywords((subject + " " + body).lower())
         
         # Check for high urgency indicators
-        for keyword in self.urgency_indicators["High"]:
-            if keyword.lower() in combined_text:
-                return "High"
+        if not matched.isdisjoint(self._high_urgency_keywords):
+            return "High"
         
         # Check for medium urgency indicators
-        for keyword in self.urgency_indicators["Medium"]:
-            if keyword.lower() in combined_text:
-                return "Medium"
+        if not matched.isdisjoint(self._medium_urgency_keywords):
+            return "Medium"
         
         # Default to low if no higher urgency detected
         return "Low"
     
-    def _determine_tone(self, body: str) -> str:
+    def _determine_tone(self, body: str, matched: Optional[FrozenSet[str]] = None) -> str:
         """
         Determine email tone based on content analysis.
         Returns: "escalation", "threatening", "polite", or "neutral"
         """
-        body_lower = body.lower()
+        if matched is None:
+            matched = self._match_keywords(body.lower())
         tone_scores = {}
         
         # Calculate score for each tone
-        for tone, indicators in self.tone_indicators.items():
-            score = 0
-            for keyword in indicators:
-                if keyword.lower() in body_lower:
-                    score += 1
-            tone_scores[tone] = score
+        for tone, keywords in self._tone_keywords.items():
+            tone_scores[tone] = len(matched & keywords)
         
         # Return the tone with highest score, default to neutral for ties
         max_score = max(tone_scores.values()) if tone_scores else 0
@@ -219,20 +255,17 @@ class EmailParserAgent(BaseAgent):
         # Fallback
         return max(tone_scores.items(), key=lambda x: x[1])[0]
     
-    def _determine_issue_type(self, subject: str, body: str) -> str:
+    def _determine_issue_type(self, subject: str, body: str, matched: Optional[FrozenSet[str]] = None) -> str:
         """
         Determine the type of issue or request in the email.
         """
-        combined_text = (subject + " " + body).lower()
+        if matched is None:
+            matched = self._match_keywords((subject + " " + body).lower())
         issue_scores = {}
         
         # Calculate score for each issue type
-        for issue_type, indicators in self.issue_types.items():
-            score = 0
-            for keyword in indicators:
-                if keyword.lower() in combined_text:
-                    score += 1
-            issue_scores[issue_type] = score
+        for issue_type, keywords in self._issue_keywords.items():
+            issue_scores[issue_type] = len(matched & keywords)
         
         # Return issue type with highest score
         max_score = max(issue_scores.values()) if issue_scores else 0
@@ -6,6 +6,8 @@ import re
 import json
 import uuid
 
+_VALID_CURRENCIES = frozenset(("USD", "EUR", "GBP", "JPY", "CAD", "AUD"))
+
 class JSONAgent(BaseAgent):
     """
     JSON Agent that processes webhook data, validates against required schema fields,
@@ -16,7 +18,7 @@ class JSONAgent(BaseAgent):
         super().__init__(name="JSON Agent")
         self.memory_store = memory_store
         self.required_fields = ["order_id", "customer", "items", "total_amount", "currency", "delivery_date"]
-        self.valid_currencies = ["USD", "EUR", "GBP", "JPY", "CAD", "AUD"]
+        self.valid_currencies = _VALID_CURRENCIES
     
     def process(self, json_data: Dict[str, Any], conversation_id: Optional[str] = None) -> Dict[str, Any]:
         """
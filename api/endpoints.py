@@ -2,15 +2,20 @@ from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Body
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, Union, List
+from collections import OrderedDict
+from collections.abc import Mapping
+import hashlib
 import uvicorn
 import json
 import os
-import sqlite3
+import orjson
 
+from config import Config
 from agents.classifier_agent import ClassifierAgent
-from memory.memory_store import MemoryStore
+from memory.memory_store import AsyncMemoryStore, create_memory_store
 from utils.alert_system import AlertSystem
 from utils.summary_generator import SummaryGenerator
+from utils.result_view import extract_views
 from mcp.action_chain import ActionChain, register_default_actions
 
 # Models
@@ -38,133 +43,146 @@ class ActionChainInput(BaseModel):
     conditions: List[Dict[str, Any]]
     actions: List[str]
 
+def _orjson_default(value: Any) -> Any:
+    """Encode mappings orjson does not know, such as the store's lazy rows."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class OrjsonResponse(JSONResponse):
+    """JSON response encoded in a single pass by orjson."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
 # Initialize app and dependencies
-app = FastAPI(title="Multi-Agent AI System")
-memory_store = MemoryStore()
+app = FastAPI(title="Multi-Agent AI System", default_response_class=OrjsonResponse)
+memory_store = create_memory_store(shards=Config.MEMORY_SHARDS)
+async_memory_store = AsyncMemoryStore(memory_store)
 classifier = ClassifierAgent(memory_store)
 alert_system = AlertSystem()
 summary_generator = SummaryGenerator()
 action_chain = ActionChain()
 register_default_actions(action_chain)
 
-# Define some default action chains
-action_chain.define_chain(
-    "urgent_email_chain",
-    [{"field": "format", "operator": "eq", "value": "Email"}, 
-     {"field": "processed_data.urgency", "operator": "eq", "value": "High"}],
-    ["email_notification", "flag_for_review"]
-)
+# Classifier results keyed by the input's type and a digest of the raw payload;
+# rules are static at runtime. The type matters because the classifier treats
+# bytes, text and parsed JSON differently even when the raw payload is the same.
+CLASSIFICATION_CACHE_SIZE = 4096
+_classification_cache: "OrderedDict[tuple, Dict[str, str]]" = OrderedDict()
 
-action_chain.define_chain(
-    "high_value_order_chain",
-    [{"field": "format", "operator": "eq", "value": "JSON"}, 
-     {"field": "processed_data.flowbit_data.total_amount", "operator": "gt", "value": 1000}],
-    ["add_to_crm", "email_notification"]
-)
-
-action_chain.define_chain(
-    "regulation_document_chain",
-    [{"field": "format", "operator": "eq", "value": "PDF"}, 
-     {"field": "intent", "operator": "eq", "value": "Regulation"}],
-    ["compliance_report", "flag_for_review"]
-)
+# Simplified histories keyed by (conversation_id, store's history version)
+SIMPLIFIED_CACHE_SIZE = 256
+_simplified_cache: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
 
 # Utility functions
-def find_related_inputs(memory_store, conversation_id: str) -> List[str]:
-    """Find all inputs related to the current conversation"""
-    conn = sqlite3.connect(memory_store.db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+def _classify_cached(raw_content: Union[str, bytes], input_content: Any) -> Dict[str, str]:
+    """Classify input, reusing the previous result for byte-identical payloads."""
+    raw_bytes = raw_content if isinstance(raw_content, bytes) else raw_content.encode("utf-8")
+    cache_key = (type(input_content), hashlib.blake2b(raw_bytes, digest_size=16).digest())
     
-    cursor.execute(
-        "SELECT DISTINCT format_type FROM metadata WHERE conversation_id = ?",
-        (conversation_id,)
-    )
-    formats = [row['format_type'] for row in cursor.fetchall()]
-    conn.close()
+    classification = _classification_cache.get(cache_key)
+    if classification is not None:
+        _classification_cache.move_to_end(cache_key)
+    else:
+        classification = classifier.classify_format_intent(input_content)
+        _classification_cache[cache_key] = classification
+        if len(_classification_cache) > CLASSIFICATION_CACHE_SIZE:
+            _classification_cache.popitem(last=False)
     
-    return formats
+    return dict(classification)
+
+def find_related_inputs(memory_store, conversation_id: str) -> List[str]:
+    """Find all inputs related to the current conversation"""
+    return memory_store.find_related_inputs(conversation_id)
 
 def merge_results(memory_store, conversation_id: str) -> Optional[Dict[str, Any]]:
     """Merge results from multiple agents for related inputs"""
-    formats = find_related_inputs(memory_store, conversation_id)
-    
-    if len(formats) > 1:
-        merged_data = {"formats": formats, "merged": True}
-        
-        for agent_name in ["json_agent", "email_agent", "pdf_agent"]:
-            extraction = memory_store.get_latest_extraction(conversation_id, agent_name)
-            if extraction:
-                merged_data[f"{agent_name}_data"] = extraction["data"]
-        
-        result = {
-            "format_type": "merged",
-            "intent": "composite",
-            "data": merged_data
-        }
-        memory_store.store_result(conversation_id, result)
-        
-        return merged_data
-    
-    return None
+    return memory_store.merge_results(conversation_id)
 
 def simplify_conversation_history(history_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Simplify a complex conversation history into a standardized format.
     """
     conversation_id = history_data.get("conversation_id", "")
+    # History arrives in the store's seq order
     raw_history = history_data.get("history", [])
     
-    raw_history.sort(key=lambda x: x.get("timestamp", ""))
-    
     simplified_events = []
     pending_metadata = {}
     
     for item in raw_history:
-        if not item.get("data"):
+        data = item.get("data")
+        if not data:
             continue
         
-        event = {
-            "id": item.get("id", ""),
-            "source": item.get("agent", item.get("source", "")),
-            "format": item.get("format_type", item.get("format", "")),
-            "intent": item.get("intent", ""),
-            "timestamp": item.get("timestamp", ""),
-            "data": {}
-        }
+        source = item.get("agent", item.get("source", ""))
+        format_type = item.get("format_type", item.get("format", ""))
+        intent = item.get("intent", "")
+        
+        # Metadata with no format or intent only contributes id/source/timestamp,
+        # which are held back and merged into the next meaningful event
+        if item.get("activity_type") == "metadata" and not format_type and not intent:
+            for key, value in (("id", item.get("id", "")), ("source", source),
+                               ("timestamp", item.get("timestamp", ""))):
+                if value and key not in pending_metadata:
+                    pending_metadata[key] = value
+            continue
         
         # Extract data - avoid nested data.data structures
-        data = item.get("data", {})
-        while isinstance(data, dict) and "data" in data and isinstance(data["data"], dict) and len(data) == 1:
+        while isinstance(data, dict) and len(data) == 1 and isinstance(data.get("data"), dict):
             data = data["data"]
-        event["data"] = data
         
-        # Check if this is just metadata with no meaningful content
-        is_metadata_only = (
-            item.get("activity_type") == "metadata" and 
-            not event["format"] and 
-            not event["intent"]
-        )
+        event = {
+            "id": item.get("id", ""),
+            "source": source,
+            "format": format_type,
+            "intent": intent,
+            "timestamp": item.get("timestamp", ""),
+            "data": data
+        }
         
-        if is_metadata_only:
-            # Store as pending metadata to merge with next meaningful event
-            for key, value in event.items():
-                if value and key not in pending_metadata:
-                    pending_metadata[key] = value
-        else:
-            # Merge any pending metadata into this event
+        # Merge any pending metadata into this event
+        if pending_metadata:
             for key, value in pending_metadata.items():
-                if not event.get(key) and key != "data":
+                if not event[key]:
                     event[key] = value
-                    
-            simplified_events.append(event)
             pending_metadata = {}
+        
+        simplified_events.append(event)
     
     return {
         "conversation_id": conversation_id,
         "events": simplified_events
     }
 
+def _build_simplified(conversation_id: str) -> Dict[str, Any]:
+    """
+    Load and simplify a conversation history, reusing the events built by an
+    earlier call while no new activity has been stored for the conversation.
+    """
+    # The version is read from indexes alone, so a hit skips loading the history
+    cache_key = (conversation_id, memory_store.get_history_version(conversation_id))
+    
+    events = _simplified_cache.get(cache_key)
+    if events is not None:
+        _simplified_cache.move_to_end(cache_key)
+    else:
+        history = memory_store.get_conversation_history(conversation_id, parse=True)
+        history_data = {
+            "conversation_id": conversation_id,
+            "history": history
+        }
+        events = simplify_conversation_history(history_data)["events"]
+        _simplified_cache[cache_key] = events
+        if len(_simplified_cache) > SIMPLIFIED_CACHE_SIZE:
+            _simplified_cache.popitem(last=False)
+    
+    return {
+        "conversation_id": conversation_id,
+        "events": events
+    }
+
 # API Endpoints
 @app.post("/process")
 async def process_any(
@@ -178,48 +196,49 @@ async def process_any(
     """
     try:
         input_content = None
+        raw_content = None
+        pending_metadata = []
         
         if not conversation_id:
             conversation_id = memory_store.generate_conversation_id()
         
         if file:
             input_content = await file.read()
-            file_metadata = {
+            raw_content = input_content
+            pending_metadata.append({
                 "conversation_id": conversation_id,
                 "source": "file_upload",
                 "file_name": file.filename
-            }
-            memory_store.store_metadata(file_metadata)
+            })
             
         elif content:
             input_content = content
+            raw_content = content
             try:
                 input_content = json.loads(content)
-                json_metadata = {
+                pending_metadata.append({
                     "conversation_id": conversation_id,
                     "source": "json_input",
                     "format_type": "json"
-                }
-                memory_store.store_metadata(json_metadata)
+                })
             except json.JSONDecodeError:
-                text_metadata = {
+                pending_metadata.append({
                     "conversation_id": conversation_id,
                     "source": "text_input"
-                }
-                memory_store.store_metadata(text_metadata)
+                })
         else:
             raise HTTPException(status_code=400, detail="No content or file provided")
         
         # Classification and routing
-        classification = classifier.classify_format_intent(input_content)
+        classification = _classify_cached(raw_content, input_content)
         
-        format_intent_metadata = {
+        pending_metadata.append({
             "conversation_id": conversation_id,
             "source": "classifier",
             "format_type": classification["format"],
             "intent": classification["intent"]
-        }
-        memory_store.store_metadata(format_intent_metadata)
+        })
+        memory_store.store_metadata_batch(pending_metadata)
             
         result = classifier.route_to_agent(input_content, conversation_id)
         
@@ -227,29 +246,31 @@ async def process_any(
         result["intent"] = classification["intent"]
         
         # Check for related inputs that might need to be merged
-        formats = memory_store.find_related_inputs(conversation_id)
-        if len(formats) > 1:
-            merged_result = memory_store.merge_results(conversation_id)
-            if merged_result:
-                result["merged_data"] = merged_result
+        merged_result = memory_store.merge_results(conversation_id)
+        if merged_result:
+            result["merged_data"] = merged_result
+        
+        # Shared views of the result for summary, alerts and action chains
+        views = extract_views(result)
         
         # Generate summary
-        summary = summary_generator.generate_summary(result)
+        summary = summary_generator.generate_summary(result, views)
         result["summary"] = summary["summary"]
         
         # Check for alerts
-        alerts = alert_system.check_alerts(result)
+        alerts = alert_system.check_alerts(result, views)
         if alerts:
             result["alerts"] = alerts
         
         # Run action chains
-        action_results = action_chain.process(result)
+        action_results = action_chain.process(result, views)
         if action_results:
             result["actions"] = action_results
                 
         result["conversation_id"] = conversation_id
-                
-        return result
+        
+        # Encode the result directly rather than walking it with jsonable_encoder first
+        return OrjsonResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -257,12 +278,7 @@ async def process_any(
 async def get_simplified_conversation_history(conversation_id: str):
     """Get a simplified version of the conversation history."""
     try:
-        history = memory_store.get_conversation_history(conversation_id)
-        history_data = {
-            "conversation_id": conversation_id,
-            "history": history
-        }
-        simplified = simplify_conversation_history(history_data)
+        simplified = _build_simplified(conversation_id)
         
         # Add conversation summary
         if simplified.get("events"):
@@ -282,7 +298,7 @@ async def get_simplified_conversation_history(conversation_id: str):
 async def get_conversation_history(conversation_id: str):
     """Get the full history for a conversation."""
     try:
-        history = memory_store.get_conversation_history(conversation_id)
+        history = await async_memory_store.get_conversation_history(conversation_id, parse=True)
         return {"conversation_id": conversation_id, "history": history}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -291,7 +307,7 @@ async def get_conversation_history(conversation_id: str):
 async def get_conversation_result(conversation_id: str):
     """Get the final result for a conversation."""
     try:
-        result = memory_store.get_result(conversation_id)
+        result = await async_memory_store.get_result(conversation_id)
         if not result:
             raise HTTPException(status_code=404, detail="Result not found")
         return result
@@ -304,12 +320,7 @@ async def get_conversation_result(conversation_id: str):
 async def get_conversation_summary(conversation_id: str):
     """Get a summary for the conversation."""
     try:
-        history = memory_store.get_conversation_history(conversation_id)
-        history_data = {
-            "conversation_id": conversation_id,
-            "history": history
-        }
-        simplified = simplify_conversation_history(history_data)
+        simplified = _build_simplified(conversation_id)
         
         if not simplified.get("events"):
             raise HTTPException(status_code=404, detail="No events found for conversation")
@@ -374,69 +385,6 @@ async def define_action_chain(chain_input: ActionChainInput):
         return {"success": True, "chain_id": chain_input.chain_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
-    @app.post("/process-email", response_model=Dict[str, Any])
-    async def process_email(request: Request):
-        """Process an uploaded email document and trigger appropriate actions"""
-        data = await request.json()
-        email_content = data.get("content", "")
-
-        conversation_id = memory_store.generate_conversation_id()
-
-        classifier_agent = ClassifierAgent(memory_store=memory_store)
-        classification = classifier_agent.classify_format_intent(email_content)
-        
-        memory_store.add_classification(classification)
-
-        metadata = {
-            "conversation_id": conversation_id,
-            "source": "api",
-            "format_type": classification["format"],
-            "intent": classification["intent"],
-            "timestamp": memory_store.get_timestamp()
-        }
-        memory_store.store_metadata(metadata)
-        
-        email_agent = EmailParserAgent()
-        email_result = email_agent.process(email_content)
-
-        memory_store.store_extraction(conversation_id, "email_agent", email_result)
-
-        combined_result = {
-            "format": classification["format"],
-            "intent": classification["intent"],
-            "processed_data": email_result,
-            "conversation_id": conversation_id
-        }
-        
-        alerts = alert_system.check_alerts(combined_result)
-        if alerts:
-            for alert in alerts:
-                memory_store.store_alert(conversation_id, alert)
-        
-        action_result = action_router.route_action(conversation_id, combined_result)
-        
-        chain_results = action_chain.evaluate(combined_result)
-        
-        summary = summary_generator.generate_summary(combined_result)
-
-        final_result = {
-            "format_type": classification["format"],
-            "intent": classification["intent"],
-            "email_data": email_result,
-            "alerts": alerts,
-            "action_taken": action_result,
-            "chain_actions": chain_results,
-            "summary": summary
-        }
-        memory_store.store_result(conversation_id, final_result)
-        
-        return {
-            "success": True,
-            "conversation_id": conversation_id,
-            "classification": classification,
-            "result": final_result
-        }
 
 if __name__ == "__main__":
-    uvicorn.run("api.endpoints:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("api.endpoints:app", host="0.0.0.0", port=8000, reload=Config.API_RELOAD)
\ No newline at end of file
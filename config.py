@@ -14,10 +14,13 @@ class Config:
     MEMORY_HOST = os.getenv("MEMORY_HOST", "localhost")
     MEMORY_PORT = os.getenv("MEMORY_PORT", 6379) 
     MEMORY_DB = os.getenv("MEMORY_DB", 0)  
+    # SQLite files the memory store splits conversations across (1 = single file)
+    MEMORY_SHARDS = int(os.getenv("MEMORY_SHARDS", 1))
 
     # API configuration
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = os.getenv("API_PORT", 8000)
+    API_RELOAD = os.getenv("API_RELOAD", "false").lower() == "true"  # Development only
 
     # File upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB limit
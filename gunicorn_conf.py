@@ -0,0 +1,15 @@
+import os
+
+from config import Config
+
+# Production server settings: gunicorn main:app -c gunicorn_conf.py
+bind = f"{Config.API_HOST}:{Config.API_PORT}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2 * (os.cpu_count() or 1) + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so workers fork with agents and default
+# chains already set up. Building a MemoryStore leaves no SQLite connection
+# open: each worker opens its writer, readers and checkpoint thread on first
+# use, and a fork hook resets any store state inherited from the master.
+preload_app = True
+keepalive = 5
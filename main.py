@@ -5,13 +5,13 @@ from fastapi.responses import HTMLResponse
 import os
 import uvicorn
 
-from api.endpoints import app as api_app
-from memory.memory_store import MemoryStore
+from config import Config
+from api.endpoints import app as api_app, memory_store
 from utils.alert_system import AlertSystem
 from utils.summary_generator import SummaryGenerator
 from mcp.action_chain import ActionChain, register_default_actions
 from mcp.action_router import ActionRouter
-from utils.api_client import APIClient
+from utils.api_client import APIClient, close_shared_session
 
 app = FastAPI(title="Multi-Agent AI System Dashboard")
 
@@ -22,8 +22,8 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 templates = Jinja2Templates(directory="templates")
 
-# Initialize components
-memory_store = MemoryStore()
+# Initialize components; the memory store is shared with the API so the
+# process holds a single set of writer connections and checkpoint threads
 alert_system = AlertSystem()
 summary_generator = SummaryGenerator()
 action_chain = ActionChain()
@@ -45,29 +45,14 @@ async def startup_event():
     global api_client
     api_client = APIClient(simulate=True)
     
-    # Define some default action chains
-    action_chain.define_chain(
-        "urgent_email_chain",
-        [{"field": "format", "operator": "eq", "value": "Email"}, 
-         {"field": "processed_data.urgency", "operator": "eq", "value": "High"}],
-        ["email_notification", "flag_for_review"]
-    )
-
-    action_chain.define_chain(
-        "high_value_order_chain",
-        [{"field": "format", "operator": "eq", "value": "JSON"}, 
-         {"field": "processed_data.flowbit_data.total_amount", "operator": "gt", "value": 1000}],
-        ["add_to_crm", "email_notification"]
-    )
-
-    action_chain.define_chain(
-        "regulation_document_chain",
-        [{"field": "format", "operator": "eq", "value": "PDF"}, 
-         {"field": "intent", "operator": "eq", "value": "Regulation"}],
-        ["compliance_report", "flag_for_review"]
-    )
-    
     print("Multi-Agent AI System initialized with alert system, summarization, and action chaining")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Write any buffered action log entries and release pooled connections
+    action_router.close()
+    close_shared_session()
+    await api_client.aclose()
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=Config.API_RELOAD)
\ No newline at end of file
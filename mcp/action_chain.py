@@ -1,7 +1,39 @@
-from typing import Dict, Any, List, Callable, Optional
+from typing import Dict, Any, List, Callable, Optional, Tuple
 import datetime
 import importlib
 import inspect
+import re
+
+from utils.result_view import ResultView
+
+# Operator codes used by compiled conditions
+_OP_EQ = 0
+_OP_NEQ = 1
+_OP_GT = 2
+_OP_LT = 3
+_OP_CONTAINS = 4
+_OP_REGEX = 5
+_OP_UNKNOWN = -1
+
+_OPERATORS = {
+    "eq": _OP_EQ,
+    "neq": _OP_NEQ,
+    "gt": _OP_GT,
+    "lt": _OP_LT,
+    "contains": _OP_CONTAINS,
+    "regex": _OP_REGEX
+}
+
+# Field paths that can be answered from a precomputed ResultView
+_VIEW_FIELDS = {
+    ("format",): "format",
+    ("intent",): "intent",
+    ("processed_data", "urgency"): "urgency",
+    ("processed_data", "flowbit_data", "total_amount"): "total_amount"
+}
+
+# (field path parts, operator code, comparison value, ResultView attribute or None)
+CompiledCondition = Tuple[Tuple[str, ...], int, Any, Optional[str]]
 
 class ActionChain:
     """Manages chains of actions to be executed based on extracted data."""
@@ -48,66 +80,87 @@ class ActionChain:
             if action_id not in self.registered_actions:
                 return False
         
+        try:
+            compiled = tuple(self._compile_condition(condition) for condition in conditions)
+        except re.error:
+            return False
+        
         self.action_chains[chain_id] = {
             "conditions": conditions,
+            "compiled": compiled,
             "actions": actions,
             "created_at": datetime.datetime.now().isoformat()
         }
         return True
     
-    def _check_condition(self, condition: Dict[str, Any], data: Dict[str, Any]) -> bool:
-        """Check if a single condition is met"""
-        field = condition.get("field", "")
-        operator = condition.get("operator", "eq")
+    @staticmethod
+    def _compile_condition(condition: Dict[str, Any]) -> CompiledCondition:
+        """Pre-split the field path and resolve the operator code once per chain."""
+        op = _OPERATORS.get(condition.get("operator", "eq"), _OP_UNKNOWN)
         value = condition.get("value")
+        if op == _OP_REGEX:
+            value = re.compile(value)
+        parts = tuple(condition.get("field", "").split("."))
+        return parts, op, value, _VIEW_FIELDS.get(parts)
+    
+    def _check_condition(self, condition: CompiledCondition, data: Dict[str, Any],
+                         ctx: Optional[ResultView] = None) -> bool:
+        """Check if a single compiled condition is met"""
+        parts, op, value, view_field = condition
         
-        # Navigate nested fields using dot notation
-        field_parts = field.split(".")
-        current = data
-        for part in field_parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
+        if ctx is not None and view_field is not None:
+            current = getattr(ctx, view_field)
+            if current is None:
                 return False
-        
-        actual_value = current
+        else:
+            # Navigate nested fields using the pre-split dot notation
+            current = data
+            for part in parts:
+                if isinstance(current, dict) and part in current:
+                    current = current[part]
+                else:
+                    return False
         
         # Apply the operator
-        if operator == "eq":
-            return actual_value == value
-        elif operator == "neq":
-            return actual_value != value
-        elif operator == "gt":
-            return actual_value > value
-        elif operator == "lt":
-            return actual_value < value
-        elif operator == "contains":
-            return value in actual_value if hasattr(actual_value, "__contains__") else False
-        elif operator == "regex":
-            import re
-            return bool(re.search(value, str(actual_value)))
+        if op == _OP_EQ:
+            return current == value
+        if op == _OP_NEQ:
+            return current != value
+        if op == _OP_GT:
+            return current > value
+        if op == _OP_LT:
+            return current < value
+        if op == _OP_CONTAINS:
+            return value in current if hasattr(current, "__contains__") else False
+        if op == _OP_REGEX:
+            return value.search(str(current)) is not None
         
         return False
     
-    def _check_all_conditions(self, conditions: List[Dict[str, Any]], 
-                             data: Dict[str, Any]) -> bool:
-        """Check if all conditions in a list are met"""
-        return all(self._check_condition(condition, data) for condition in conditions)
+    def _check_all_conditions(self, conditions: Tuple[CompiledCondition, ...], 
+                             data: Dict[str, Any], ctx: Optional[ResultView] = None) -> bool:
+        """Check if all compiled conditions in a chain are met"""
+        for condition in conditions:
+            if not self._check_condition(condition, data, ctx):
+                return False
+        return True
     
-    def process(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def process(self, data: Dict[str, Any], ctx: Optional[ResultView] = None) -> List[Dict[str, Any]]:
         """
         Process data through all defined chains and execute matching actions.
         
         Args:
             data: Data to check against chain conditions
+            ctx: Optional precomputed view of data; a None field counts as missing
             
         Returns:
             List of action results
         """
         results = []
+        check_all = self._check_all_conditions
         
         for chain_id, chain in self.action_chains.items():
-            if self._check_all_conditions(chain["conditions"], data):
+            if check_all(chain["compiled"], data, ctx):
                 chain_results = []
                 
                 # Execute each action in the chain
@@ -136,9 +189,63 @@ class ActionChain:
         
         return results
 
+# CRM handlers keyed by result format
+def _crm_email(data):
+    email_data = data.get("processed_data", {})
+    return {
+        "crm_action": "contact_added",
+        "contact": {
+            "name": email_data.get("sender_name"),
+            "email": email_data.get("sender_email"),
+            "status": "simulated"
+        }
+    }
+
+def _crm_json(data):
+    json_data = data.get("processed_data", {}).get("flowbit_data", {})
+    return {
+        "crm_action": "order_added",
+        "order": {
+            "id": json_data.get("order_id"),
+            "customer": json_data.get("customer"),
+            "amount": json_data.get("total_amount"),
+            "status": "simulated"
+        }
+    }
+
+def _crm_not_applicable(data):
+    return {"status": "not_applicable"}
+
+_CRM_HANDLERS = {
+    "Email": _crm_email,
+    "JSON": _crm_json
+}
+
+# Default chains as (chain_id, conditions, actions), defined by register_default_actions
+DEFAULT_CHAINS: List[Tuple[str, List[Dict[str, Any]], List[str]]] = [
+    (
+        "urgent_email_chain",
+        [{"field": "format", "operator": "eq", "value": "Email"}, 
+         {"field": "processed_data.urgency", "operator": "eq", "value": "High"}],
+        ["email_notification", "flag_for_review"]
+    ),
+    (
+        "high_value_order_chain",
+        [{"field": "format", "operator": "eq", "value": "JSON"}, 
+         {"field": "processed_data.flowbit_data.total_amount", "operator": "gt", "value": 1000}],
+        ["add_to_crm", "email_notification"]
+    ),
+    (
+        "regulation_document_chain",
+        [{"field": "format", "operator": "eq", "value": "PDF"}, 
+         {"field": "intent", "operator": "eq", "value": "Regulation"}],
+        ["compliance_report", "flag_for_review"]
+    )
+]
+
 # Register common actions
 def register_default_actions(action_chain):
-    """Register a set of default actions with the action chain."""
+    """Register a set of default actions and the DEFAULT_CHAINS with the action chain."""
     
     def send_email_notification(data):
         """Send an email notification based on processed data."""
@@ -153,31 +260,7 @@ def register_default_actions(action_chain):
     def add_to_crm(data):
         """Add extracted information to a CRM system."""
         # In a real implementation, this would connect to a CRM API
-        format_type = data.get("format")
-        
-        if format_type == "Email":
-            email_data = data.get("processed_data", {})
-            return {
-                "crm_action": "contact_added",
-                "contact": {
-                    "name": email_data.get("sender_name"),
-                    "email": email_data.get("sender_email"),
-                    "status": "simulated"
-                }
-            }
-        elif format_type == "JSON":
-            json_data = data.get("processed_data", {}).get("flowbit_data", {})
-            return {
-                "crm_action": "order_added",
-                "order": {
-                    "id": json_data.get("order_id"),
-                    "customer": json_data.get("customer"),
-                    "amount": json_data.get("total_amount"),
-                    "status": "simulated"
-                }
-            }
-        
-        return {"status": "not_applicable"}
+        return _CRM_HANDLERS.get(data.get("format"), _crm_not_applicable)(data)
     
     def flag_for_review(data):
         """Flag the content for manual review."""
@@ -204,4 +287,8 @@ def register_default_actions(action_chain):
     action_chain.register_action("email_notification", send_email_notification)
     action_chain.register_action("add_to_crm", add_to_crm)
     action_chain.register_action("flag_for_review", flag_for_review)
-    action_chain.register_action("compliance_report", generate_compliance_report)
\ No newline at end of file
+    action_chain.register_action("compliance_report", generate_compliance_report)
+    
+    # Define the default chains
+    for chain_id, conditions, actions in DEFAULT_CHAINS:
+        action_chain.define_chain(chain_id, conditions, actions)
\ No newline at end of file
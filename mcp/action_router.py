@@ -1,9 +1,137 @@
-import json
+import asyncio
+import httpx
+import itertools
+import orjson
+import os
+import re
+import threading
 import uuid
 import requests
 import time
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from collections import deque
+from dataclasses import asdict, dataclass, replace
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Callable, FrozenSet, Tuple
+from datetime import datetime, timedelta
+
+# Monetary amount parsing
+_AMOUNT_FIELDS = ("total_amount", "amount", "total", "invoice_total", "payment_amount")
+_NESTED_AMOUNT_KEYS = ("data", "flowbit_data", "invoice_data")
+_CURRENCY_RE = re.compile(r"[$€£,\s]")
+
+_NO_FLAGS: FrozenSet[str] = frozenset()
+_METADATA_SOURCE = "action_router"
+
+# Fields left out of payloads built from unprocessed data
+_EXCLUDED_KEYS = frozenset({"text_snippet", "body_snippet"})
+_BINARY_TYPES = (bytes, bytearray, memoryview)
+
+# Request bodies are encoded with orjson; naive datetimes are sent as UTC and
+# non-string keys are allowed like the json module does
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+# Retry policy shared by the requests session and the async client: gateway
+# errors and failed connections are retried with exponential backoff
+_RETRY_STATUSES = (502, 503, 504)
+_MAX_RETRIES = 2
+_RETRY_BACKOFF_S = 0.2
+
+@dataclass(frozen=True, slots=True)
+class Action:
+    """A routed follow-up action."""
+    type: str
+    target: str
+    priority: str
+    description: str
+    endpoint: Optional[str] = None
+
+# Actions that do not depend on the data; shared across calls
+_COMPLIANCE_ACTION = Action("flag_compliance_risk", "compliance", "high",
+                            "Regulatory document requires compliance review")
+_REGULATORY_CONTENT_ACTION = Action("flag_compliance_risk", "compliance", "high",
+                                    "Document contains regulatory content")
+_INVOICE_REVIEW_ACTION = Action("create_payment_review", "ticketing", "medium",
+                                "High-value invoice requires approval")
+_COMPLAINT_ACTION = Action("escalate_issue", "crm", "high",
+                           "Customer complaint requires attention", "/crm/escalate")
+_FRAUD_ACTION = Action("flag_risk_alert", "risk_alert", "critical",
+                       "Potential fraud detected in transaction")
+
+# Simulated API responses per action type. "{id}" is replaced with the
+# generated action id; None marks fields filled in per action.
+_RESPONSE_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "create_ticket": {
+        "success": True,
+        "ticket_id": "TICKET-{id}",
+        "status": "created",
+        "assigned_to": "Support Team",
+        "priority": None,
+        "url": "https://example.com/tickets/TICKET-{id}"
+    },
+    "escalate_issue": {
+        "success": True,
+        "case_id": "CASE-{id}",
+        "status": "escalated",
+        "assigned_to": "Customer Relations Manager",
+        "priority": "high",
+        "sla_hours": 4,
+        "url": "https://example.com/crm/cases/CASE-{id}"
+    },
+    "flag_compliance_risk": {
+        "success": True,
+        "risk_id": "COMP-{id}",
+        "status": "flagged",
+        "assigned_to": "Compliance Team",
+        "review_deadline": None,
+        "url": "https://example.com/compliance/COMP-{id}"
+    },
+    "flag_risk_alert": {
+        "success": True,
+        "alert_id": "RISK-{id}",
+        "status": "under_review",
+        "risk_score": 0.85,
+        "assigned_to": "Fraud Prevention Team",
+        "url": "https://example.com/risk/alerts/RISK-{id}"
+    },
+    "create_payment_review": {
+        "success": True,
+        "review_id": "PAY-{id}",
+        "status": "pending_approval",
+        "amount": None,
+        "approver": "Finance Manager",
+        "url": "https://example.com/finance/approvals/PAY-{id}"
+    },
+    "flag_data_issue": {
+        "success": True,
+        "issue_id": "DATA-{id}",
+        "status": "open",
+        "assigned_to": "Data Quality Team",
+        "url": "https://example.com/data/issues/DATA-{id}"
+    },
+    "archive_data": {
+        "success": True,
+        "archive_id": "ARCH-{id}",
+        "status": "archived",
+        "retention_period": "90 days",
+        "url": "https://example.com/archive/ARCH-{id}"
+    }
+}
+_GENERIC_RESPONSE_TEMPLATE: Dict[str, Any] = {
+    "success": True,
+    "action_id": "GEN-{id}",
+    "status": "processed",
+    "message": "Action processed successfully"
+}
+
+# Keys of each template that carry the action id, so only those are formatted
+def _id_fields(template: Dict[str, Any]) -> Tuple[str, ...]:
+    return tuple(k for k, v in template.items() if isinstance(v, str) and "{id}" in v)
+
+_TEMPLATE_ID_FIELDS: Dict[str, Tuple[str, ...]] = {
+    action_type: _id_fields(template) for action_type, template in _RESPONSE_TEMPLATES.items()
+}
+_GENERIC_ID_FIELDS = _id_fields(_GENERIC_RESPONSE_TEMPLATE)
 
 class ActionRouter:
     """
@@ -12,9 +140,30 @@ class ActionRouter:
     Simulates REST API calls to external systems.
     """
     
-    def __init__(self, memory_store=None, simulate=True):
+    def __init__(self, memory_store=None, simulate=True, max_concurrency: int = 16,
+                 max_batch_size: int = 32, batch_error_threshold: float = 0.25,
+                 simulate_latency_s: float = 0.0, log_flush_threshold: int = 32,
+                 http2: bool = True):
         self.memory_store = memory_store
         self.simulate = simulate
+        # Artificial network latency for simulated calls; 0 disables it
+        self.simulate_latency_s = simulate_latency_s
+        
+        # Action log entries are buffered and written to the memory store in bulk.
+        # The buffer is sharded so threads sharing the router rarely contend on a lock.
+        self._log_flush_threshold = log_flush_threshold
+        self._log_shards: List[Dict[str, Any]] = [
+            {"log": [], "lock": threading.Lock()} for _ in range(os.cpu_count() or 4)
+        ]
+        self._shard_counter = itertools.count()
+        self._thread_shard = threading.local()
+        self.max_concurrency = max_concurrency
+        
+        # Adaptive batching: shrink batches while the recent batch error rate is high
+        self.max_batch_size = max_batch_size
+        self.batch_error_threshold = batch_error_threshold
+        self._batch_size = max_batch_size
+        self._recent_batch_failures = deque(maxlen=20)
         self.api_endpoints = {
             "crm": "https://api.example.com/crm",
             "ticketing": "https://api.example.com/tickets",
@@ -23,6 +172,82 @@ class ActionRouter:
             "notification": "https://api.example.com/notify",
             "archive": "https://api.example.com/archive"
         }
+        
+        # Routing: exact (format, intent) matches first, then data-dependent rules
+        self._action_table: Dict[Tuple[str, str], Action] = {
+            ("PDF", "Regulation"): _COMPLIANCE_ACTION,
+            ("Email", "Complaint"): _COMPLAINT_ACTION,
+            ("JSON", "Fraud Risk"): _FRAUD_ACTION
+        }
+        self._format_predicates = self._build_format_predicates()
+        
+        self._headers = {"Content-Type": "application/json", "X-Api-Key": "simulation-key"}
+        
+        # Pooled session so repeated actions reuse TCP/TLS connections per endpoint
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=_MAX_RETRIES, backoff_factor=_RETRY_BACKOFF_S,
+                              status_forcelist=_RETRY_STATUSES, allowed_methods=None)
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # Async path: one HTTP/2 client multiplexes concurrent actions per host
+        self.http2 = http2
+        self._async_client: Optional[httpx.AsyncClient] = None
+    
+    def _my_shard(self) -> Dict[str, Any]:
+        """Return the log shard of the calling thread, assigning one round-robin on first use."""
+        index = getattr(self._thread_shard, "index", None)
+        if index is None:
+            index = self._thread_shard.index = next(self._shard_counter) % len(self._log_shards)
+        return self._log_shards[index]
+    
+    @staticmethod
+    def _drain_shard(shard: Dict[str, Any]) -> List[Tuple[str, str, str, str, Dict[str, Any]]]:
+        with shard["lock"]:
+            rows, shard["log"] = shard["log"], []
+        return rows
+    
+    def flush(self) -> None:
+        """Write buffered action log entries from all shards to the memory store."""
+        rows = []
+        for shard in self._log_shards:
+            rows.extend(self._drain_shard(shard))
+        if rows:
+            self.memory_store.store_actions_bulk(rows)
+    
+    def close(self) -> None:
+        """Flush the action log and close pooled HTTP connections."""
+        self.flush()
+        self._session.close()
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Return the async client, creating it on first use. It is bound to the
+        running event loop, so it must be closed with aclose() on that loop.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=10
+            )
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP client's connections."""
+        if self._async_client is not None:
+            client, self._async_client = self._async_client, None
+            await client.aclose()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
     
     def route_action(self, conversation_id: str, processed_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -38,142 +263,160 @@ class ActionRouter:
         format_type = processed_data.get("format", "")
         intent = processed_data.get("intent", "")
         
+        # One timestamp for the payload, the response and the log entry
+        ts = datetime.now().isoformat()
+        
         # Determine action based on format and intent
         action = self._determine_action(format_type, intent, processed_data)
         
         # Execute the determined action
-        result = self._execute_action(action, conversation_id, processed_data)
-        
-        # Log the action in memory store if available
-        if self.memory_store:
-            self.memory_store.store_action(
-                conversation_id=conversation_id,
-                chain_id=f"router_{format_type}_{intent}",
-                action_id=action["type"],
-                status="completed",
-                result={
-                    "action": action,
-                    "result": result,
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
+        result = self._execute_action(action, conversation_id, processed_data, ts)
         
+        return self._complete_action(conversation_id, format_type, intent, action, result, ts)
+    
+    async def route_action_async(self, conversation_id: str, processed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of route_action; only the API call (or simulated delay) is awaited.
+        
+        Args:
+            conversation_id: The ID of the conversation
+            processed_data: The processed data from an agent
+            
+        Returns:
+            Dictionary with action result
+        """
+        format_type = processed_data.get("format", "")
+        intent = processed_data.get("intent", "")
+        
+        ts = datetime.now().isoformat()
+        
+        action = self._determine_action(format_type, intent, processed_data)
+        result = await self._execute_action_async(action, conversation_id, processed_data, ts)
+        
+        return await self._complete_action_async(conversation_id, format_type, intent, action, result, ts)
+    
+    def _complete_action(self, conversation_id: str, format_type: str, intent: str,
+                         action: Action, result: Dict[str, Any], ts: str) -> Dict[str, Any]:
+        """Log an executed action and build the routing result."""
+        rows = self._queue_action(conversation_id, format_type, intent, action, result, ts)
+        if rows:
+            self.memory_store.store_actions_bulk(rows)
+        return self._routing_result(conversation_id, action, result)
+    
+    async def _complete_action_async(self, conversation_id: str, format_type: str, intent: str,
+                                     action: Action, result: Dict[str, Any], ts: str) -> Dict[str, Any]:
+        """Like _complete_action, with the log write run off the event loop."""
+        rows = self._queue_action(conversation_id, format_type, intent, action, result, ts)
+        if rows:
+            await asyncio.to_thread(self.memory_store.store_actions_bulk, rows)
+        return self._routing_result(conversation_id, action, result)
+    
+    def _queue_action(self, conversation_id: str, format_type: str, intent: str,
+                      action: Action, result: Dict[str, Any], ts: str) -> List[Tuple[str, str, str, str, Dict[str, Any]]]:
+        """
+        Queue an executed action for the memory store log, if there is one.
+        Returns the shard's entries when it fills up, for the caller to write.
+        """
+        if not self.memory_store:
+            return []
+        
+        entry = (
+            conversation_id,
+            f"router_{format_type}_{intent}",
+            action.type,
+            "completed",
+            {
+                "action": asdict(action),
+                "result": result,
+                "timestamp": ts
+            }
+        )
+        shard = self._my_shard()
+        with shard["lock"]:
+            shard["log"].append(entry)
+            full = len(shard["log"]) >= self._log_flush_threshold
+        return self._drain_shard(shard) if full else []
+    
+    @staticmethod
+    def _routing_result(conversation_id: str, action: Action, result: Dict[str, Any]) -> Dict[str, Any]:
         return {
-            "action_type": action["type"],
-            "action_target": action["target"],
+            "action_type": action.type,
+            "action_target": action.target,
             "result": result,
             "conversation_id": conversation_id
         }
     
-    def _determine_action(self, format_type: str, intent: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _determine_action(self, format_type: str, intent: str, data: Dict[str, Any]) -> Action:
         """
         Determine what action to take based on format type, intent, and data content.
         
         Returns:
-            Dictionary with action details
+            Action to take
         """
-        # Handle PDF documents
-        if format_type == "PDF":
-            if intent == "Regulation":
-                return {
-                    "type": "flag_compliance_risk",
-                    "target": "compliance",
-                    "priority": "high",
-                    "description": "Regulatory document requires compliance review"
-                }
-            elif "flags" in data and any(flag["type"] == "regulatory_content" for flag in data.get("flags", [])):
-                return {
-                    "type": "flag_compliance_risk",
-                    "target": "compliance",
-                    "priority": "high",
-                    "description": "Document contains regulatory content"
-                }
-            elif "invoice_data" in data and self._check_high_value(data.get("invoice_data", {})):
-                return {
-                    "type": "create_payment_review",
-                    "target": "ticketing",
-                    "priority": "medium",
-                    "description": "High-value invoice requires approval"
-                }
-        
-        # Handle Email format
-        elif format_type == "Email":
-            if intent == "Complaint":
-                return {
-                    "type": "escalate_issue",
-                    "target": "crm",
-                    "priority": "high",
-                    "description": "Customer complaint requires attention",
-                    "endpoint": "/crm/escalate"
-                }
-            
-            # Check email urgency and tone
-            if "urgency" in data and data["urgency"] == "High":
-                return {
-                    "type": "escalate_issue",
-                    "target": "crm",
-                    "priority": "high",
-                    "description": f"Urgent email: {data.get('subject', 'No subject')}",
-                    "endpoint": "/crm/escalate"
-                }
-            
-            if "tone" in data and data["tone"] in ["escalation", "threatening"]:
-                return {
-                    "type": "escalate_issue",
-                    "target": "crm",
-                    "priority": "high",
-                    "description": f"Customer escalation: {data.get('subject', 'No subject')}",
-                    "endpoint": "/crm/escalate"
-                }
-
-            # For other emails
-            return {
-                "type": "create_ticket",
-                "target": "ticketing",
-                "priority": "medium" if data.get("urgency") == "Medium" else "low",
-                "description": f"Email follow-up: {data.get('subject', 'No subject')}"
-            }
+        action = self._action_table.get((format_type, intent))
+        if action is not None:
+            return action
         
-        # Handle JSON data
-        elif format_type == "JSON":
-            if intent == "Fraud Risk":
-                return {
-                    "type": "flag_risk_alert",
-                    "target": "risk_alert",
-                    "priority": "critical",
-                    "description": "Potential fraud detected in transaction"
-                }
-            
-            # Check for anomalies in JSON data
-            if "anomalies" in data and len(data["anomalies"]) > 0:
-                return {
-                    "type": "flag_data_issue",
-                    "target": "ticketing",
-                    "priority": "medium",
-                    "description": f"Data anomalies detected: {len(data['anomalies'])} issues found"
-                }
+        rules = self._format_predicates.get(format_type)
+        if rules:
+            # Index flag types once so rules can test membership instead of scanning
+            flag_types = (frozenset(flag.get("type") for flag in data.get("flags", ()))
+                          if "flags" in data else _NO_FLAGS)
             
-            # Check for high value orders
-            if "processed_data" in data and "flowbit_data" in data["processed_data"]:
-                flowbit_data = data["processed_data"]["flowbit_data"]
-                if "total_amount" in flowbit_data and self._check_high_value(flowbit_data):
-                    return {
-                        "type": "create_payment_review",
-                        "target": "crm",
-                        "priority": "medium",
-                        "description": f"High-value order: {flowbit_data.get('order_id', 'Unknown ID')}"
-                    }
+            for predicate, build in rules:
+                if predicate(data, flag_types):
+                    return build(data)
         
         # Default action for anything not specifically handled
+        return Action("archive_data", "archive", "low",
+                      f"Archiving {format_type} data with {intent} intent")
+    
+    def _build_format_predicates(self) -> Dict[str, List[Tuple[Callable[[Dict[str, Any], FrozenSet[str]], bool],
+                                                             Callable[[Dict[str, Any]], Action]]]]:
+        """
+        Data-dependent routing rules per format, checked in order after the
+        (format, intent) table. The first matching rule wins, so each list can
+        be reordered by measured match rate as long as the outcome is unchanged.
+        """
         return {
-            "type": "archive_data",
-            "target": "archive",
-            "priority": "low",
-            "description": f"Archiving {format_type} data with {intent} intent"
+            "PDF": [
+                (lambda d, flags: "regulatory_content" in flags,
+                 lambda d: _REGULATORY_CONTENT_ACTION),
+                (lambda d, flags: "invoice_data" in d
+                    and self._check_high_value(d.get("invoice_data", {})),
+                 lambda d: _INVOICE_REVIEW_ACTION),
+            ],
+            
+            # Urgency and tone, otherwise a follow-up ticket
+            "Email": [
+                (lambda d, flags: d.get("urgency") == "High",
+                 lambda d: replace(_COMPLAINT_ACTION,
+                                   description=f"Urgent email: {d.get('subject', 'No subject')}")),
+                (lambda d, flags: d.get("tone") in ("escalation", "threatening"),
+                 lambda d: replace(_COMPLAINT_ACTION,
+                                   description=f"Customer escalation: {d.get('subject', 'No subject')}")),
+                (lambda d, flags: True,
+                 lambda d: Action("create_ticket", "ticketing",
+                                  "medium" if d.get("urgency") == "Medium" else "low",
+                                  f"Email follow-up: {d.get('subject', 'No subject')}")),
+            ],
+            
+            # Anomalies and high value orders
+            "JSON": [
+                (lambda d, flags: "anomalies" in d and len(d["anomalies"]) > 0,
+                 lambda d: Action("flag_data_issue", "ticketing", "medium",
+                                  f"Data anomalies detected: {len(d['anomalies'])} issues found")),
+                (lambda d, flags: "processed_data" in d
+                    and "flowbit_data" in d["processed_data"]
+                    and "total_amount" in d["processed_data"]["flowbit_data"]
+                    and self._check_high_value(d["processed_data"]["flowbit_data"]),
+                 lambda d: Action("create_payment_review", "crm", "medium",
+                                  f"High-value order: {d['processed_data']['flowbit_data'].get('order_id', 'Unknown ID')}")),
+            ],
         }
     
-    def _execute_action(self, action: Dict[str, Any], conversation_id: str, 
-                       data: Dict[str, Any]) -> Dict[str, Any]:
+    def _execute_action(self, action: Action, conversation_id: str, 
+                       data: Dict[str, Any], ts: str) -> Dict[str, Any]:
         """
         Execute the specified action by making an API call or simulation.
         
@@ -181,27 +424,63 @@ class ActionRouter:
             action: The action to execute
             conversation_id: The conversation ID
             data: The data to send with the action
+            ts: ISO timestamp shared by the payload and the response
+            
+        Returns:
+            Dictionary with action result
+        """
+        payload = self._build_payload(action, conversation_id, data, ts)
+        
+        # If simulating, return a mock response
+        if self.simulate:
+            return self._simulate_api_response(action.type, action.target, payload, ts)
+            
+        # Otherwise make the actual API call
+        return self._post_action(action.target, payload)
+    
+    async def _execute_action_async(self, action: Action, conversation_id: str,
+                                    data: Dict[str, Any], ts: str) -> Dict[str, Any]:
+        """
+        Execute the specified action without blocking the event loop.
+        
+        Args:
+            action: The action to execute
+            conversation_id: The conversation ID
+            data: The data to send with the action
+            ts: ISO timestamp shared by the payload and the response
             
         Returns:
             Dictionary with action result
         """
-        action_type = action["type"]
-        target = action["target"]
-        priority = action["priority"]
-        description = action["description"]
+        payload = self._build_payload(action, conversation_id, data, ts)
+        
+        if self.simulate:
+            if self.simulate_latency_s:
+                await asyncio.sleep(self.simulate_latency_s)
+            return self._build_simulated_response(action.type, action.target, payload, ts)
+        
+        return await self._post_action_async(action.target, payload)
+    
+    def _build_payload(self, action: Action, conversation_id: str,
+                       data: Dict[str, Any], ts: str) -> Dict[str, Any]:
+        """Prepare the API payload for an action."""
+        action_type = action.type
+        
+        # Archived data is not inspected downstream, so only identify it
+        if action_type == "archive_data":
+            return {"action": action_type, "conversation_id": conversation_id, "timestamp": ts}
+        
+        format_type = data.get("format", "Unknown")
+        intent = data.get("intent", "Unknown")
         
         # Prepare the payload for the API call
         payload = {
             "action": action_type,
-            "priority": priority,
-            "description": description,
+            "priority": action.priority,
+            "description": action.description,
             "conversation_id": conversation_id,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": {
-                "format": data.get("format", "Unknown"),
-                "intent": data.get("intent", "Unknown"),
-                "source": "action_router"
-            }
+            "timestamp": ts,
+            "metadata": {"format": format_type, "intent": intent, "source": _METADATA_SOURCE}
         }
         
         # Add relevant data from the processed data
@@ -209,50 +488,96 @@ class ActionRouter:
             payload["data"] = data["processed_data"]
         elif "extracted_data" in data:
             payload["data"] = data["extracted_data"]
+        elif _EXCLUDED_KEYS.isdisjoint(data) and not any(isinstance(v, _BINARY_TYPES) for v in data.values()):
+            # Nothing to filter, send the data as is
+            payload["data"] = data
         else:
             # Filter out large fields to avoid bloating the payload
             filtered_data = {k: v for k, v in data.items() 
-                           if k not in ["text_snippet", "body_snippet"] and not isinstance(v, bytes)}
+                           if k not in _EXCLUDED_KEYS and not isinstance(v, _BINARY_TYPES)}
             payload["data"] = filtered_data
         
-        # If simulating, return a mock response
-        if self.simulate:
-            return self._simulate_api_response(action_type, target, payload)
-            
-        # Otherwise make the actual API call
+        return payload
+    
+    def _post_action(self, target: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send an action payload to the target system's API."""
         try:
             endpoint = self.api_endpoints.get(target, "https://api.example.com/default")
-            headers = {"Content-Type": "application/json", "X-Api-Key": "simulation-key"}
             
-            response = requests.post(
+            response = self._session.post(
                 endpoint,
-                headers=headers,
-                json=payload,
+                headers=self._headers,
+                data=orjson.dumps(payload, option=_ORJSON_OPTIONS),
                 timeout=10
             )
+            return self._action_result(response)
+                
+        except Exception as e:
+            return self._request_error(e)
+    
+    async def _post_action_async(self, target: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send an action payload to the target system's API over the async HTTP/2 client."""
+        try:
+            endpoint = self.api_endpoints.get(target, "https://api.example.com/default")
             
-            if response.status_code in [200, 201, 202]:
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "response": response.json() if response.text else {},
-                    "message": "Action executed successfully"
-                }
-            else:
-                return {
-                    "success": False,
-                    "status_code": response.status_code,
-                    "message": f"API error: {response.text}"
-                }
+            response = await self._post_async(endpoint, orjson.dumps(payload, option=_ORJSON_OPTIONS))
+            return self._action_result(response)
                 
         except Exception as e:
+            return self._request_error(e)
+    
+    async def _post_async(self, url: str, content: bytes) -> httpx.Response:
+        """
+        POST over the async client, retrying like the requests session does:
+        up to _MAX_RETRIES more attempts on gateway errors or failed connections.
+        """
+        client = self._get_async_client()
+        attempt = 0
+        while True:
+            try:
+                response = await client.post(url, headers=self._headers, content=content)
+                if response.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+                    return response
+            except httpx.ConnectError:
+                if attempt == _MAX_RETRIES:
+                    raise
+            await asyncio.sleep(_RETRY_BACKOFF_S * (2 ** attempt))
+            attempt += 1
+    
+    def _action_result(self, response: Any) -> Dict[str, Any]:
+        """Build the action result for a requests or httpx response."""
+        if 200 <= response.status_code < 300:
+            return {
+                "success": True,
+                "status_code": response.status_code,
+                "response": self._json_body(response),
+                "message": "Action executed successfully"
+            }
+        else:
             return {
                 "success": False,
-                "message": f"Error executing action: {str(e)}",
-                "error_type": type(e).__name__
+                "status_code": response.status_code,
+                "message": f"API error: {response.text}"
             }
     
-    def _simulate_api_response(self, action_type: str, target: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _request_error(e: Exception) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "message": f"Error executing action: {str(e)}",
+            "error_type": type(e).__name__
+        }
+    
+    @staticmethod
+    def _json_body(response: Any) -> Any:
+        """Decode a JSON response body; empty or non-JSON bodies give {}."""
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+    
+    def _simulate_api_response(self, action_type: str, target: str, payload: Dict[str, Any],
+                               ts: str) -> Dict[str, Any]:
         """
         Simulate an API response for testing without making actual API calls.
         
@@ -260,91 +585,42 @@ class ActionRouter:
             action_type: Type of action being executed
             target: Target system
             payload: Action payload
+            ts: ISO timestamp of the action
             
         Returns:
             Simulated API response
         """
-        # Add a small delay to simulate network latency
-        time.sleep(0.2)
+        # Optionally add a delay to simulate network latency
+        if self.simulate_latency_s:
+            time.sleep(self.simulate_latency_s)
         
+        return self._build_simulated_response(action_type, target, payload, ts)
+    
+    def _build_simulated_response(self, action_type: str, target: str, payload: Dict[str, Any],
+                                  ts: str) -> Dict[str, Any]:
+        """Build the mock response body for a simulated action."""
         # Generate a unique ID for the simulated response
         action_id = str(uuid.uuid4())[:8].upper()
         
-        responses = {
-            "create_ticket": {
-                "success": True,
-                "ticket_id": f"TICKET-{action_id}",
-                "status": "created",
-                "assigned_to": "Support Team",
-                "priority": payload.get("priority", "medium"),
-                "url": f"https://example.com/tickets/TICKET-{action_id}"
-            },
-            "escalate_issue": {
-                "success": True,
-                "case_id": f"CASE-{action_id}",
-                "status": "escalated",
-                "assigned_to": "Customer Relations Manager",
-                "priority": "high",
-                "sla_hours": 4,
-                "url": f"https://example.com/crm/cases/CASE-{action_id}"
-            },
-            "flag_compliance_risk": {
-                "success": True,
-                "risk_id": f"COMP-{action_id}",
-                "status": "flagged",
-                "assigned_to": "Compliance Team",
-                "review_deadline": (datetime.now() + 
-                                  datetime.timedelta(days=3)).isoformat(),
-                "url": f"https://example.com/compliance/COMP-{action_id}"
-            },
-            "flag_risk_alert": {
-                "success": True,
-                "alert_id": f"RISK-{action_id}",
-                "status": "under_review",
-                "risk_score": 0.85,
-                "assigned_to": "Fraud Prevention Team",
-                "url": f"https://example.com/risk/alerts/RISK-{action_id}"
-            },
-            "create_payment_review": {
-                "success": True,
-                "review_id": f"PAY-{action_id}",
-                "status": "pending_approval",
-                "amount": self._extract_amount(payload),
-                "approver": "Finance Manager",
-                "url": f"https://example.com/finance/approvals/PAY-{action_id}"
-            },
-            "flag_data_issue": {
-                "success": True,
-                "issue_id": f"DATA-{action_id}",
-                "status": "open",
-                "assigned_to": "Data Quality Team",
-                "url": f"https://example.com/data/issues/DATA-{action_id}"
-            },
-            "archive_data": {
-                "success": True,
-                "archive_id": f"ARCH-{action_id}",
-                "status": "archived",
-                "retention_period": "90 days",
-                "url": f"https://example.com/archive/ARCH-{action_id}"
-            }
-        }
-        
         # Get the appropriate response template or use a generic one
-        response_template = responses.get(action_type, {
-            "success": True,
-            "action_id": f"GEN-{action_id}",
-            "status": "processed",
-            "message": "Action processed successfully"
-        })
+        template = _RESPONSE_TEMPLATES.get(action_type, _GENERIC_RESPONSE_TEMPLATE)
+        response = dict(template)
+        for key in _TEMPLATE_ID_FIELDS.get(action_type, _GENERIC_ID_FIELDS):
+            response[key] = template[key].format(id=action_id)
+        
+        # Fill in the fields that depend on the action itself
+        if action_type == "create_ticket":
+            response["priority"] = payload.get("priority", "medium")
+        elif action_type == "flag_compliance_risk":
+            response["review_deadline"] = (datetime.fromisoformat(ts) + timedelta(days=3)).isoformat()
+        elif action_type == "create_payment_review":
+            response["amount"] = self._extract_amount(payload)
         
         # Add standard fields to all responses
-        response = {
-            **response_template,
-            "timestamp": datetime.now().isoformat(),
-            "target_system": target,
-            "conversation_id": payload.get("conversation_id", ""),
-            "simulation": True
-        }
+        response["timestamp"] = ts
+        response["target_system"] = target
+        response["conversation_id"] = payload.get("conversation_id", "")
+        response["simulation"] = True
         
         return response
     
@@ -360,28 +636,29 @@ class ActionRouter:
     
     def _extract_amount(self, data: Dict[str, Any]) -> float:
         """Extract numerical amount from different data structures."""
-        # Try different common field names for monetary amounts
-        for field in ["total_amount", "amount", "total", "invoice_total", "payment_amount"]:
-            if field in data:
-                try:
-                    # Handle string values with currency symbols
-                    if isinstance(data[field], str):
-                        # Remove currency symbols and commas
-                        cleaned = data[field].replace('$', '').replace('€', '').replace('£', '').replace(',', '')
-                        return float(cleaned)
-                    return float(data[field])
-                except (ValueError, TypeError):
-                    continue
-        
-        # Look in nested structures
-        if "data" in data:
-            return self._extract_amount(data["data"])
-        
-        if "flowbit_data" in data:
-            return self._extract_amount(data["flowbit_data"])
+        while isinstance(data, dict):
+            # Try different common field names for monetary amounts
+            for field in _AMOUNT_FIELDS:
+                if field in data:
+                    value = data[field]
+                    if isinstance(value, (int, float)):
+                        return float(value)
+                    try:
+                        # Handle string values with currency symbols
+                        if isinstance(value, str):
+                            # Remove currency symbols, thousands separators and spaces
+                            return float(_CURRENCY_RE.sub("", value))
+                        return float(value)
+                    except (ValueError, TypeError):
+                        continue
             
-        if "invoice_data" in data:
-            return self._extract_amount(data["invoice_data"])
+            # Descend into the first nested structure present
+            for key in _NESTED_AMOUNT_KEYS:
+                if key in data:
+                    data = data[key]
+                    break
+            else:
+                break
         
         # If we can't find a relevant amount, return 0
         return 0.0
@@ -390,17 +667,148 @@ class ActionRouter:
         """
         Process a batch of agent results and route appropriate actions.
         
+        Actions are executed concurrently. Callers already running an event
+        loop should await batch_process_async instead, and aclose() when done.
+        
         Args:
             results: List of agent processing results
             
         Returns:
             List of action results
         """
-        action_results = []
+        async def run() -> List[Dict[str, Any]]:
+            try:
+                return await self.batch_process_async(results)
+            finally:
+                # The async client cannot outlive this call's event loop
+                await self.aclose()
         
-        for result in results:
+        return asyncio.run(run())
+    
+    async def batch_process_async(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Route actions for a batch of agent results. Actions are grouped by
+        target system and each group is sent as multi-action POSTs to the
+        target's /batch endpoint; groups are sent concurrently, with at most
+        max_concurrency requests in flight.
+        
+        Args:
+            results: List of agent processing results
+            
+        Returns:
+            List of action results, in input order
+        """
+        # One timestamp for the whole batch
+        ts = datetime.now().isoformat()
+        
+        # Both lists are sized up front and filled by index
+        count = len(results)
+        planned = [None] * count
+        action_results = [None] * count
+        buckets: Dict[str, List[int]] = {}
+        
+        for index, result in enumerate(results):
             conversation_id = result.get("conversation_id", str(uuid.uuid4()))
-            action_result = self.route_action(conversation_id, result)
-            action_results.append(action_result)
+            format_type = result.get("format", "")
+            intent = result.get("intent", "")
+            action = self._determine_action(format_type, intent, result)
+            payload = self._build_payload(action, conversation_id, result, ts)
+            planned[index] = (conversation_id, format_type, intent, action, payload)
+            buckets.setdefault(action.target, []).append(index)
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def send_bucket(target: str, indices: List[int]) -> None:
+            position = 0
+            while position < len(indices):
+                chunk = indices[position:position + self._batch_size]
+                position += len(chunk)
+                
+                async with semaphore:
+                    responses = await self._execute_batch_async(
+                        target, [planned[i][4] for i in chunk], ts
+                    )
+                self._record_batch_outcome(any(not r.get("success") for r in responses))
+                
+                for i, response in zip(chunk, responses):
+                    conversation_id, format_type, intent, action, _ = planned[i]
+                    action_results[i] = await self._complete_action_async(
+                        conversation_id, format_type, intent, action, response, ts
+                    )
+        
+        await asyncio.gather(*(send_bucket(target, indices) for target, indices in buckets.items()))
+        # SQLite writes block, so they run in a worker thread
+        await asyncio.to_thread(self.flush)
+        return action_results
+    
+    async def _execute_batch_async(self, target: str, payloads: List[Dict[str, Any]],
+                                   ts: str) -> List[Dict[str, Any]]:
+        """Execute several actions for one target as a single batch call."""
+        if self.simulate:
+            if self.simulate_latency_s:
+                await asyncio.sleep(self.simulate_latency_s)
+            return [self._build_simulated_response(payload["action"], target, payload, ts)
+                    for payload in payloads]
+        
+        return await self._post_batch_async(target, payloads)
+    
+    async def _post_batch_async(self, target: str, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send several action payloads to the target's /batch endpoint over the
+        HTTP/2 client and split the response back into one result per payload.
+        """
+        try:
+            endpoint = self.api_endpoints.get(target, "https://api.example.com/default")
             
-        return action_results
\ No newline at end of file
+            response = await self._post_async(f"{endpoint}/batch", self._batch_body(payloads))
+            return self._batch_results(response, len(payloads))
+                
+        except Exception as e:
+            failure = self._request_error(e)
+            return [dict(failure) for _ in payloads]
+    
+    @staticmethod
+    def _batch_body(payloads: List[Dict[str, Any]]) -> bytes:
+        return orjson.dumps({
+            "calls": payloads,
+            "idempotency_keys": [uuid.uuid4().hex for _ in payloads]
+        }, option=_ORJSON_OPTIONS)
+    
+    def _batch_results(self, response: Any, count: int) -> List[Dict[str, Any]]:
+        """Split a /batch response into one action result per submitted call."""
+        if 200 <= response.status_code < 300:
+            body = self._json_body(response)
+            items = body.get("results") if isinstance(body, dict) else None
+            if isinstance(items, list) and len(items) == count:
+                return [
+                    {
+                        "success": True,
+                        "status_code": response.status_code,
+                        "response": item,
+                        "message": "Action executed successfully"
+                    }
+                    for item in items
+                ]
+            failure = {
+                "success": False,
+                "status_code": response.status_code,
+                "message": "API error: batch response does not match the submitted calls"
+            }
+        else:
+            failure = {
+                "success": False,
+                "status_code": response.status_code,
+                "message": f"API error: {response.text}"
+            }
+        
+        return [dict(failure) for _ in range(count)]
+    
+    def _record_batch_outcome(self, failed: bool) -> None:
+        """Halve the batch size while recent batches fail too often, grow it back otherwise."""
+        self._recent_batch_failures.append(failed)
+        error_rate = sum(self._recent_batch_failures) / len(self._recent_batch_failures)
+        
+        if error_rate > self.batch_error_threshold:
+            self._batch_size = max(1, self._batch_size // 2)
+        elif not failed:
+            self._batch_size = min(self.max_batch_size, self._batch_size * 2)
\ No newline at end of file
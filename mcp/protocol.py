@@ -3,22 +3,25 @@ from typing import Any, Dict, Tuple
 class Protocol:
     def __init__(self):
         self.agents = {}
+        self._type_to_agent: Dict[str, str] = {
+            "email": "email_agent",
+            "json": "json_agent",
+            "pdf": "classifier_agent"
+        }
 
     def register_agent(self, agent_name: str, agent: Any) -> None:
         self.agents[agent_name] = agent
 
+    def register_route(self, input_type: str, agent_name: str) -> None:
+        self._type_to_agent[input_type] = agent_name
+
     def route_input(self, input_data: Dict[str, Any]) -> Tuple[str, Any]:
         input_type = input_data.get("type")
-        intent = input_data.get("intent")
 
-        if input_type == "email":
-            return "email_agent", self.agents["email_agent"].process(input_data)
-        elif input_type == "json":
-            return "json_agent", self.agents["json_agent"].process(input_data)
-        elif input_type == "pdf":
-            return "classifier_agent", self.agents["classifier_agent"].process(input_data)
-        else:
-            raise ValueError("Unsupported input type")
+        agent_name = self._type_to_agent.get(input_type)
+        if agent_name is None:
+            raise ValueError(f"Unsupported input type {input_type!r}")
+        return agent_name, self.agents[agent_name].process(input_data)
 
     def get_agent_status(self) -> Dict[str, str]:
-        return {name: agent.get_status() for name, agent in self.agents.items()}
\ No newline at end of file
+        return {name: agent.get_status() for name, agent in self.agents.items()}
@@ -1,77 +1,647 @@
+import asyncio
+import functools
+import hashlib
 import json
+import os
 import sqlite3
+import threading
+import time
 import uuid
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import weakref
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+from datetime import datetime, timezone
+
+from memory.models import ActionRow, AlertRow, TraceRow
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+def _dumps(value: Any) -> str:
+    """Serialize a value for a TEXT column, with orjson when it is available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Values orjson rejects (e.g. integers beyond 64 bits) go through json
+            pass
+    return json.dumps(value)
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+def _str_keys(value: Any) -> Any:
+    """
+    Convert non-string dict keys the way JSON does (1 -> "1", True -> "true"),
+    so a payload reads back the same from a MessagePack BLOB as from JSON
+    text. Containers without such keys are returned as they are. Keys JSON
+    cannot represent raise TypeError.
+    """
+    if isinstance(value, dict):
+        converted = {
+            key if isinstance(key, str) else _json_key(key): _str_keys(item)
+            for key, item in value.items()
+        }
+        if len(converted) == len(value) and all(
+            a is b and converted[a] is item for a, (b, item) in zip(converted, value.items())
+        ):
+            return value
+        return converted
+    if isinstance(value, (list, tuple)):
+        converted = [_str_keys(item) for item in value]
+        if all(a is b for a, b in zip(converted, value)):
+            return value
+        return converted
+    return value
+
+def _json_key(key: Any) -> str:
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(key)
+    raise TypeError(f"unsupported dict key type: {type(key).__name__}")
+
+def _pack(value: Any) -> Union[bytes, str]:
+    """
+    Serialize a payload column (data, result) as a MessagePack BLOB. Without
+    msgpack, or for values it cannot encode such as datetimes, the column
+    holds JSON text instead. Dict keys are stored as strings, as JSON would.
+    """
+    if msgpack is not None:
+        try:
+            return msgpack.packb(_str_keys(value), use_bin_type=True)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return _dumps(value)
+
+def _unpack(value: Union[bytes, str]) -> Any:
+    """
+    Decode a payload column: BLOBs are MessagePack, text is JSON. BLOBs
+    written before keys were converted to strings may hold other key types.
+    """
+    if isinstance(value, bytes):
+        return msgpack.unpackb(value, raw=False, strict_map_key=False)
+    return _loads(value)
+
+def _new_id() -> bytes:
+    """
+    Record ids are stored as 16-byte BLOBs and exposed as 32-char hex strings.
+    The bytes are a version 4 UUID built straight from os.urandom, skipping
+    the uuid.UUID object that uuid.uuid4() would create and discard.
+    """
+    raw = bytearray(os.urandom(16))
+    raw[6] = raw[6] & 0x0F | 0x40
+    raw[8] = raw[8] & 0x3F | 0x80
+    return bytes(raw)
+
+def _id_to_api(record_id: Any) -> Any:
+    return record_id.hex() if isinstance(record_id, bytes) else record_id
+
+def _id_from_api(record_id: str) -> Any:
+    try:
+        return bytes.fromhex(record_id)
+    except ValueError:
+        # Rows written before ids became BLOBs keep their text UUIDs
+        return record_id
+
+# Connection settings applied to every new connection. WAL lets readers run
+# alongside a writer and needs one fsync per commit instead of two, which
+# makes synchronous=NORMAL safe. WAL keeps "-wal" and "-shm" files next to
+# the database while connections are open.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456"
+)
+
+# Statements are module-level constants so the connection's statement cache
+# reuses their prepared form on every call
+_SQL_INSERT_CLASSIFICATION = """
+    INSERT INTO classifications (id, format, intent, timestamp, data)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_METADATA = """
+    INSERT INTO metadata (id, conversation_id, source, format_type, intent, timestamp, data, seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_EXTRACTION = """
+    INSERT INTO extractions (id, conversation_id, agent, timestamp, data, seq)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_RESULT = """
+    INSERT INTO results (id, conversation_id, format_type, intent, timestamp, data, seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+# Writing an action whose record id already exists moves it to the new status
+# in the same statement; the first write's triggered_at and seq are kept
+_SQL_INSERT_ACTION = """
+    INSERT INTO actions
+    (id, conversation_id, chain_id, action_id, status, triggered_at, completed_at, result, seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        status = excluded.status,
+        completed_at = excluded.completed_at,
+        result = excluded.result
+"""
+_SQL_UPDATE_ACTION_RESULT = """
+    UPDATE actions
+    SET status = ?, completed_at = ?, result = ?
+    WHERE id = ?
+"""
+_SQL_UPDATE_ACTION_STATUS = """
+    UPDATE actions
+    SET status = ?, completed_at = ?
+    WHERE id = ?
+"""
+_SQL_INSERT_DECISION_TRACE = """
+    INSERT INTO decision_traces
+    (id, conversation_id, agent, decision_point, reasoning, alternatives, selected_option, confidence, timestamp, seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_ALERT = """
+    INSERT INTO alerts
+    (id, conversation_id, alert_type, severity, message, source, timestamp, data, seq)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Single-row readers name their columns so rows can be plain tuples
+_EXTRACTION_FIELDS = ("id", "conversation_id", "agent", "timestamp", "data", "seq")
+_RESULT_FIELDS = ("id", "conversation_id", "format_type", "intent", "timestamp", "data", "seq")
+_SQL_LATEST_EXTRACTION = f"""
+    SELECT {", ".join(_EXTRACTION_FIELDS)} FROM extractions
+    WHERE conversation_id = ? AND agent = ?
+    ORDER BY seq DESC, timestamp DESC
+    LIMIT 1
+"""
+_SQL_LATEST_RESULT = f"""
+    SELECT {", ".join(_RESULT_FIELDS)} FROM results
+    WHERE conversation_id = ?
+    ORDER BY seq DESC, timestamp DESC
+    LIMIT 1
+"""
+
+# The list readers name their columns in the field order of the row classes
+# in memory.models, so each row tuple maps onto a row object positionally
+_SQL_ACTION_HISTORY = """
+    SELECT id, conversation_id, chain_id, action_id, status, triggered_at, completed_at, result, seq
+    FROM actions WHERE conversation_id = ? ORDER BY seq, triggered_at
+"""
+_TRACE_COLUMNS = (
+    "id, conversation_id, agent, decision_point, reasoning, alternatives, selected_option, "
+    "confidence, timestamp, seq, n_alternatives"
+)
+_SQL_DECISION_TRACES = f"SELECT {_TRACE_COLUMNS} FROM decision_traces WHERE conversation_id = ? ORDER BY seq, timestamp"
+_SQL_DECISION_TRACES_BY_AGENT = (
+    f"SELECT {_TRACE_COLUMNS} FROM decision_traces WHERE conversation_id = ? AND agent = ? ORDER BY seq, timestamp"
+)
+
+# Trace summaries leave out the alternatives JSON and read its length from the
+# generated n_alternatives column instead
+_TRACE_SUMMARY_FIELDS = (
+    "id", "conversation_id", "agent", "decision_point", "reasoning", "selected_option",
+    "confidence", "timestamp", "seq", "n_alternatives"
+)
+_TRACE_SUMMARY_COLUMNS = ", ".join(_TRACE_SUMMARY_FIELDS)
+_SQL_DECISION_TRACE_SUMMARIES = (
+    f"SELECT {_TRACE_SUMMARY_COLUMNS} FROM decision_traces "
+    "WHERE conversation_id = ? ORDER BY seq, timestamp"
+)
+_SQL_DECISION_TRACE_SUMMARIES_BY_AGENT = (
+    f"SELECT {_TRACE_SUMMARY_COLUMNS} FROM decision_traces "
+    "WHERE conversation_id = ? AND agent = ? ORDER BY seq, timestamp"
+)
+_N_ALTERNATIVES_COLUMN = "n_alternatives INTEGER GENERATED ALWAYS AS (json_array_length(alternatives)) VIRTUAL"
+_SQL_ALERTS = """
+    SELECT id, conversation_id, alert_type, severity, message, source, timestamp, data, seq
+    FROM alerts WHERE conversation_id = ? ORDER BY seq, timestamp
+"""
+_SQL_RELATED_FORMATS = "SELECT DISTINCT format_type FROM metadata WHERE conversation_id = ?"
+
+# Agents whose latest extraction goes into a merged result, in merge order
+_MERGED_AGENTS = ("json_agent", "email_agent", "pdf_agent")
+_SQL_MERGE_SOURCES = f"""
+    WITH latest AS (
+        SELECT agent, data,
+               ROW_NUMBER() OVER (PARTITION BY agent ORDER BY seq DESC, timestamp DESC) AS rn
+        FROM extractions
+        WHERE conversation_id = ? AND agent IN {_MERGED_AGENTS!r}
+    )
+    SELECT 0, format_type, NULL FROM (
+        SELECT DISTINCT format_type FROM metadata WHERE conversation_id = ?
+    )
+    UNION ALL
+    SELECT 1, agent, data FROM latest WHERE rn = 1
+"""
+
+# Tables read by get_conversation_history and the activity type of their rows
+_HISTORY_SOURCES = (
+    ("metadata", "metadata"),
+    ("extractions", "extraction"),
+    ("results", "result"),
+    ("actions", "action"),
+    ("decision_traces", "decision_trace"),
+    ("alerts", "alert")
+)
+
+# Rows of the history tables carry a seq column that orders them. Rows written
+# before the column existed have seq NULL, which sorts ahead of every number,
+# and fall back to timestamp order among themselves.
+_SEQ_TABLES = tuple(table for table, _ in _HISTORY_SOURCES)
+
+# Row count and latest seq of each history table for one conversation, read
+# from the (conversation_id, seq) indexes. Actions are updated in place, so
+# their latest completion time is included as well.
+_SQL_HISTORY_VERSION = " UNION ALL ".join(
+    f"SELECT count(*), max(seq), {'max(completed_at)' if table == 'actions' else 'NULL'} "
+    f"FROM {table} WHERE conversation_id = ?"
+    for table in _SEQ_TABLES
+)
+
+# MessagePack payload columns. decision_traces.alternatives stays JSON text
+# because the generated n_alternatives column reads it with json_array_length.
+_PAYLOAD_COLUMNS = (
+    ("metadata", "data"),
+    ("classifications", "data"),
+    ("extractions", "data"),
+    ("results", "data"),
+    ("actions", "result"),
+    ("alerts", "data")
+)
+
+# The JSON column of each history activity type and the value an empty one reads as
+_DATA_COLUMN = {"data": dict}
+_HISTORY_JSON_COLUMNS = {
+    "metadata": _DATA_COLUMN,
+    "extraction": _DATA_COLUMN,
+    "result": _DATA_COLUMN,
+    "action": {"result": dict},
+    "decision_trace": {"alternatives": list},
+    "alert": _DATA_COLUMN
+}
+
+class LazyJSONRow(Mapping):
+    """
+    Read-only row whose JSON columns are parsed on first access. Callers that
+    only read plain columns such as timestamp never parse the JSON. dict(row)
+    gives a plain dict with every column parsed.
+    """
+    __slots__ = ("_values", "_defaults", "_unparsed")
+    
+    def __init__(self, values: Dict[str, Any], json_columns: Dict[str, Callable[[], Any]]):
+        self._values = values
+        self._defaults = json_columns
+        self._unparsed = set(json_columns)
+    
+    def __getitem__(self, key: str) -> Any:
+        value = self._values[key]
+        if key in self._unparsed:
+            self._unparsed.discard(key)
+            value = self._values[key] = _unpack(value) if value else self._defaults[key]()
+        return value
+    
+    def __iter__(self):
+        return iter(self._values)
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+    
+    def __repr__(self) -> str:
+        return f"LazyJSONRow({dict(self)!r})"
+    
+    @staticmethod
+    def parse_all(rows: List["LazyJSONRow"]) -> None:
+        """
+        Parse every pending JSON column of rows at once. The stored JSON texts
+        are joined into one array and parsed in a single call, which saves
+        the per-call overhead of parsing them one by one. MessagePack BLOBs
+        are decoded directly.
+        """
+        pending = []
+        for row in rows:
+            for key in row._unparsed:
+                raw = row._values[key]
+                if isinstance(raw, str) and raw:
+                    pending.append((row, key, raw))
+                else:
+                    row._values[key] = _unpack(raw) if raw else row._defaults[key]()
+            row._unparsed = set()
+        
+        if not pending:
+            return
+        values = _loads("[" + ",".join(raw for _, _, raw in pending) + "]")
+        for (row, key, _), value in zip(pending, values):
+            row._values[key] = value
+
+# SQLite connections must not be closed in a process that inherited them
+# across fork(): closing one touches locks and file state the parent still
+# uses. A forked child moves its copies here and never closes them.
+_inherited_connections: List[sqlite3.Connection] = []
+
+# Live stores, so the fork hook can reset each one in the child
+_stores: "weakref.WeakSet[MemoryStore]" = weakref.WeakSet()
+
+def _reset_stores_after_fork() -> None:
+    for store in list(_stores):
+        store._after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_stores_after_fork)
 
 class MemoryStore:
     """Memory store using SQLite for persistent agent communication and data."""
     
-    def __init__(self, db_path: str = "agent_memory.db"):
+    def __init__(self, db_path: str = "agent_memory.db", checkpoint_interval: Optional[float] = 30.0,
+                 optimize_interval: float = 900.0):
+        """
+        Args:
+            db_path: SQLite database file
+            checkpoint_interval: Seconds between WAL checkpoints run by a
+                background thread. None leaves checkpointing to SQLite, which
+                runs it inside whichever commit grows the WAL past 1000 pages.
+            optimize_interval: Seconds between PRAGMA optimize runs on the
+                writer connection, done by the same background thread
+        """
         self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._checkpoint_interval = checkpoint_interval
+        self._optimize_interval = optimize_interval
+        self._checkpoint_stop: Optional[threading.Event] = None
+        self._checkpoint_thread: Optional[threading.Thread] = None
+        
+        # Reads go through one connection per thread so they run alongside
+        # each other and the writer under WAL. _reader_conns maps the owning
+        # thread's ident to its connection so those of exited threads can be closed.
+        self._readers = threading.local()
+        self._reader_conns: Dict[int, sqlite3.Connection] = {}
+        self._reader_pid = os.getpid()
+        self._readers_lock = threading.Lock()
+        self._generation = 0
+        self._seq_lock = threading.Lock()
+        self._last_seq = 0
         self._init_database()
+        _stores.add(self)
+    
+    def _after_fork(self) -> None:
+        """
+        Reset the store in a freshly forked child. Connections inherited from
+        the parent are kept referenced but never used or closed, and the locks
+        are replaced since another parent thread may have held them at fork().
+        """
+        if self._conn is not None:
+            _inherited_connections.append(self._conn)
+        self._conn = None
+        self._conn_pid = None
+        # Only the forking thread survives, so the checkpointer is gone; the
+        # child starts its own with its first write
+        self._checkpoint_stop = None
+        self._checkpoint_thread = None
+        self._lock = threading.Lock()
+        self._seq_lock = threading.Lock()
+        self._readers_lock = threading.Lock()
+        _inherited_connections.extend(self._reader_conns.values())
+        self._reader_conns = {}
+        self._reader_pid = os.getpid()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return the store's long-lived connection, opening it on first use.
+        A connection inherited across fork() is not reused; the child process
+        opens its own. Callers must hold self._lock.
+        """
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            if self._conn is not None:
+                _inherited_connections.append(self._conn)
+            if self._checkpoint_interval:
+                self._conn = self._open_connection("PRAGMA wal_autocheckpoint=0")
+                # Threads do not survive fork(), so each process starts its own
+                self._start_checkpointer()
+            else:
+                self._conn = self._open_connection()
+            self._conn_pid = pid
+        return self._conn
+    
+    def _start_checkpointer(self) -> None:
+        """
+        Start the background checkpoint thread. It is started with the writer
+        connection, so a store that never writes, such as one preloaded in a
+        forking server's master, runs no thread. Callers must hold self._lock.
+        """
+        self._checkpoint_stop = threading.Event()
+        self._checkpoint_thread = threading.Thread(
+            target=self._checkpoint_loop,
+            args=(self._checkpoint_stop,),
+            name="memory-store-checkpoint",
+            daemon=True
+        )
+        self._checkpoint_thread.start()
+    
+    def _checkpoint_loop(self, stop: threading.Event) -> None:
+        """
+        Checkpoint the WAL every checkpoint_interval seconds until stop is set.
+        The checkpoint runs on a connection of its own in PASSIVE mode, so it
+        never waits for, or holds up, a committing writer.
+        """
+        conn = self._open_connection()
+        last_optimize = time.monotonic()
+        try:
+            while not stop.wait(self._checkpoint_interval):
+                try:
+                    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                    if time.monotonic() - last_optimize >= self._optimize_interval:
+                        with self._lock:
+                            if self._conn is not None:
+                                self._conn.execute("PRAGMA optimize")
+                        last_optimize = time.monotonic()
+                except sqlite3.Error as e:
+                    # Retried on the next tick
+                    print(f"WAL checkpoint failed: {str(e)}")
+        finally:
+            conn.close()
+    
+    def _open_connection(self, *extra_pragmas: str) -> sqlite3.Connection:
+        """
+        Open a connection with the store's settings plus any extra pragmas.
+        Rows come back as plain tuples; readers unpack them by position.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                               cached_statements=256)
+        for pragma in _PRAGMAS + extra_pragmas:
+            conn.execute(pragma)
+        return conn
+    
+    def _read_connection(self) -> sqlite3.Connection:
+        """
+        Return the calling thread's read-only connection, opening it on first
+        use. Connections from another process or from before close() are
+        replaced. Only opening a connection takes a lock.
+        """
+        readers = self._readers
+        pid = os.getpid()
+        if getattr(readers, "conn", None) is None or readers.pid != pid or readers.generation != self._generation:
+            if getattr(readers, "conn", None) is not None and readers.pid != pid:
+                # The forking thread's connection; rebinding must not close it
+                _inherited_connections.append(readers.conn)
+            readers.conn = self._open_connection("PRAGMA query_only=ON")
+            readers.pid = pid
+            readers.generation = self._generation
+            with self._readers_lock:
+                self._register_reader(readers.conn, pid)
+        return readers.conn
+    
+    def _register_reader(self, conn: sqlite3.Connection, pid: int) -> None:
+        """
+        Track a new reader connection for the calling thread and close those of
+        threads that have exited, so executor churn does not leak handles.
+        Callers must hold self._readers_lock.
+        """
+        if self._reader_pid != pid:
+            # Normally done by the after-fork hook. Connections inherited across
+            # fork() belong to the parent, so they are kept referenced, never closed.
+            _inherited_connections.extend(self._reader_conns.values())
+            self._reader_conns = {}
+            self._reader_pid = pid
+        
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._reader_conns if ident not in alive]:
+            self._reader_conns.pop(ident).close()
+        
+        # An ident already in the map was reused from a thread that has exited
+        ident = threading.get_ident()
+        previous = self._reader_conns.get(ident)
+        if previous is not None:
+            previous.close()
+        self._reader_conns[ident] = conn
+    
+    @contextmanager
+    def _transaction(self, conn: Optional[sqlite3.Connection] = None):
+        """
+        Run several statements in one write transaction on conn, or on the
+        writer connection by default. Callers using the writer must hold self._lock.
+        """
+        if conn is None:
+            conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _next_seq(self, count: int = 1) -> int:
+        """
+        Reserve count consecutive sequence numbers and return the first one.
+        Numbers follow the nanosecond clock but never repeat or go backwards
+        within a process, so rows from concurrent workers still interleave
+        by time.
+        """
+        with self._seq_lock:
+            seq = max(time.time_ns(), self._last_seq + 1)
+            self._last_seq = seq + count - 1
+        return seq
+    
+    def close(self) -> None:
+        """Stop the checkpoint thread and close the store's writer and reader connections."""
+        if self._checkpoint_stop is not None:
+            self._checkpoint_stop.set()
+            if self._checkpoint_thread.is_alive():
+                self._checkpoint_thread.join()
+            self._checkpoint_stop = None
+            self._checkpoint_thread = None
+        
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+        
+        with self._readers_lock:
+            if self._reader_pid == os.getpid():
+                for conn in self._reader_conns.values():
+                    conn.close()
+            self._reader_conns.clear()
+            self._generation += 1
     
     def _init_database(self):
         """Initialize the SQLite database with required tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
-        # Create required tables
+        # Create required tables. Only classifications is WITHOUT ROWID: its rows
+        # are small and never read back in order. The other tables hold large
+        # JSON payloads and rely on rowid for insertion order between equal
+        # timestamps.
         tables = {
             "metadata": """
                 CREATE TABLE IF NOT EXISTS metadata (
-                    id TEXT PRIMARY KEY,
+                    id BLOB PRIMARY KEY,
                     conversation_id TEXT,
                     source TEXT,
                     format_type TEXT,
                     intent TEXT,
                     timestamp TEXT,
-                    data TEXT
+                    data BLOB,
+                    seq INTEGER
                 )
             """,
             "classifications": """
                 CREATE TABLE IF NOT EXISTS classifications (
-                    id TEXT PRIMARY KEY,
+                    id BLOB NOT NULL PRIMARY KEY,
                     format TEXT,
                     intent TEXT,
                     timestamp TEXT,
-                    data TEXT
-                )
+                    data BLOB
+                ) WITHOUT ROWID
             """,
             "extractions": """
                 CREATE TABLE IF NOT EXISTS extractions (
-                    id TEXT PRIMARY KEY,
+                    id BLOB PRIMARY KEY,
                     conversation_id TEXT,
                     agent TEXT,
                     timestamp TEXT,
-                    data TEXT
+                    data BLOB,
+                    seq INTEGER
                 )
             """,
             "results": """
                 CREATE TABLE IF NOT EXISTS results (
-                    id TEXT PRIMARY KEY,
+                    id BLOB PRIMARY KEY,
                     conversation_id TEXT,
                     format_type TEXT,
                     intent TEXT,
                     timestamp TEXT,
-                    data TEXT
+                    data BLOB,
+                    seq INTEGER
                 )
             """,
             "actions": """
                 CREATE TABLE IF NOT EXISTS actions (
-                    id TEXT PRIMARY KEY,
+                    id BLOB PRIMARY KEY,
                     conversation_id TEXT,
                     chain_id TEXT,
                     action_id TEXT,
                     status TEXT,
                     triggered_at TEXT,
                     completed_at TEXT,
-                    result TEXT
+                    result BLOB,
+                    seq INTEGER
                 )
             """,
-            "decision_traces": """
+            "decision_traces": f"""
                 CREATE TABLE IF NOT EXISTS decision_traces (
-                    id TEXT PRIMARY KEY,
+                    id BLOB PRIMARY KEY,
                     conversation_id TEXT,
                     agent TEXT,
                     decision_point TEXT,
@@ -79,454 +649,803 @@ class MemoryStore:
                     alternatives TEXT,
                     selected_option TEXT,
                     confidence REAL,
-                    timestamp TEXT
+                    timestamp TEXT,
+                    seq INTEGER,
+                    {_N_ALTERNATIVES_COLUMN}
                 )
             """,
             "alerts": """
                 CREATE TABLE IF NOT EXISTS alerts (
-                    id TEXT PRIMARY KEY,
+                    id BLOB PRIMARY KEY,
                     conversation_id TEXT,
                     alert_type TEXT,
                     severity TEXT,
                     message TEXT,
                     source TEXT,
                     timestamp TEXT,
-                    data TEXT
+                    data BLOB,
+                    seq INTEGER
                 )
             """
         }
         
-        for table_sql in tables.values():
-            cursor.execute(table_sql)
-            
-        conn.commit()
-        conn.close()
+        # Every read filters by conversation and orders by seq
+        indexes = (
+            "CREATE INDEX IF NOT EXISTS idx_metadata_conv_seq ON metadata(conversation_id, seq)",
+            "CREATE INDEX IF NOT EXISTS idx_extractions_conv_agent_seq ON extractions(conversation_id, agent, seq DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_results_conv_seq ON results(conversation_id, seq DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_actions_conv_seq ON actions(conversation_id, seq)",
+            "CREATE INDEX IF NOT EXISTS idx_decision_traces_conv_agent_seq ON decision_traces(conversation_id, agent, seq)",
+            "CREATE INDEX IF NOT EXISTS idx_alerts_conv_seq ON alerts(conversation_id, seq)",
+            "CREATE INDEX IF NOT EXISTS idx_traces_conv_alts ON decision_traces(conversation_id, n_alternatives)"
+        )
+        
+        # Time-ordered indexes from before the seq column
+        stale_indexes = (
+            "idx_metadata_conv",
+            "idx_extractions_conv_agent",
+            "idx_results_conv",
+            "idx_actions_conv",
+            "idx_decision_traces_conv_agent",
+            "idx_alerts_conv"
+        )
+        
+        # The schema is set up on a short-lived connection so that building a
+        # store opens nothing that outlives __init__. The writer connection is
+        # opened by the first write, after any fork() of a preloading server.
+        conn = self._open_connection()
+        try:
+            with self._transaction(conn):
+                for table_sql in tables.values():
+                    conn.execute(table_sql)
+                
+                # Databases created before the seq column get it added in place
+                for table in _SEQ_TABLES:
+                    if "seq" not in (info[1] for info in conn.execute(f"PRAGMA table_info({table})")):
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN seq INTEGER")
+                
+                # table_xinfo, unlike table_info, lists generated columns
+                if "n_alternatives" not in (info[1] for info in conn.execute("PRAGMA table_xinfo(decision_traces)")):
+                    conn.execute(f"ALTER TABLE decision_traces ADD COLUMN {_N_ALTERNATIVES_COLUMN}")
+                for index_name in stale_indexes:
+                    conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+                for index_sql in indexes:
+                    conn.execute(index_sql)
+                self._build_history_query(conn)
+        finally:
+            conn.close()
     
     def generate_conversation_id(self) -> str:
         """Generate a unique conversation ID."""
         return str(uuid.uuid4())
     
     def get_timestamp(self) -> str:
-        """Get current timestamp in ISO format."""
-        return datetime.now().isoformat()
+        """Get current UTC timestamp in ISO format."""
+        return datetime.now(timezone.utc).isoformat()
     
     def add_classification(self, classification: Dict[str, Any]) -> str:
         """Add a classification result to memory."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        classification_id = _new_id()
         
-        classification_id = str(uuid.uuid4())
-        cursor.execute(
-            """
-            INSERT INTO classifications (id, format, intent, timestamp, data) 
-            VALUES (?, ?, ?, ?, ?)
-            """,
+        with self._lock:
+            self._connection().execute(
+                _SQL_INSERT_CLASSIFICATION,
+                (
+                    classification_id,
+                    classification.get("format", ""),
+                    classification.get("intent", ""),
+                    classification.get("timestamp", self.get_timestamp()),
+                    _pack(classification)
+                )
+            )
+        
+        return classification_id.hex()
+    
+    def add_classifications_bulk(self, classifications: List[Dict[str, Any]]) -> List[str]:
+        """Add several classification results in a single transaction."""
+        if not classifications:
+            return []
+        
+        timestamp = self.get_timestamp()
+        classification_ids = [_new_id() for _ in classifications]
+        params = [
             (
                 classification_id,
                 classification.get("format", ""),
                 classification.get("intent", ""),
-                classification.get("timestamp", self.get_timestamp()),
-                json.dumps(classification)
+                classification.get("timestamp", timestamp),
+                _pack(classification)
+            )
+            for classification_id, classification in zip(classification_ids, classifications)
+        ]
+        
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                _SQL_INSERT_CLASSIFICATION,
+                params
             )
-        )
         
-        conn.commit()
-        conn.close()
-        return classification_id
+        return [record_id.hex() for record_id in classification_ids]
     
     def store_metadata(self, metadata: Dict[str, Any]) -> str:
         """Store input metadata in memory."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        metadata_id = _new_id()
         
-        metadata_id = str(uuid.uuid4())
-        cursor.execute(
-            """
-            INSERT INTO metadata (id, conversation_id, source, format_type, intent, timestamp, data) 
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
+        with self._lock:
+            self._connection().execute(
+                _SQL_INSERT_METADATA,
+                (
+                    metadata_id,
+                    metadata.get("conversation_id", ""),
+                    metadata.get("source", ""),
+                    metadata.get("format_type", ""),
+                    metadata.get("intent", ""),
+                    metadata.get("timestamp", self.get_timestamp()),
+                    _pack(metadata),
+                    self._next_seq()
+                )
+            )
+        
+        return metadata_id.hex()
+
+    def store_metadata_batch(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """Store several metadata records in a single transaction."""
+        if not rows:
+            return []
+
+        timestamp = self.get_timestamp()
+        seq = self._next_seq(len(rows))
+        metadata_ids = [_new_id() for _ in rows]
+        params = [
             (
                 metadata_id,
                 metadata.get("conversation_id", ""),
                 metadata.get("source", ""),
                 metadata.get("format_type", ""),
                 metadata.get("intent", ""),
-                metadata.get("timestamp", self.get_timestamp()),
-                json.dumps(metadata)
+                metadata.get("timestamp", timestamp),
+                _pack(metadata),
+                seq + offset
             )
-        )
-        
-        conn.commit()
-        conn.close()
-        return metadata_id
-    
+            for offset, (metadata_id, metadata) in enumerate(zip(metadata_ids, rows))
+        ]
+
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                _SQL_INSERT_METADATA,
+                params
+            )
+
+        return [record_id.hex() for record_id in metadata_ids]
+
     def store_extraction(self, conversation_id: str, agent: str, data: Dict[str, Any]) -> str:
         """Store extraction results from an agent."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        extraction_id = _new_id()
         
-        extraction_id = str(uuid.uuid4())
-        cursor.execute(
-            """
-            INSERT INTO extractions (id, conversation_id, agent, timestamp, data) 
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                extraction_id,
-                conversation_id,
-                agent,
-                self.get_timestamp(),
-                json.dumps(data)
+        with self._lock:
+            self._connection().execute(
+                _SQL_INSERT_EXTRACTION,
+                (
+                    extraction_id,
+                    conversation_id,
+                    agent,
+                    self.get_timestamp(),
+                    _pack(data),
+                    self._next_seq()
+                )
             )
-        )
         
-        conn.commit()
-        conn.close()
-        return extraction_id
+        return extraction_id.hex()
+    
+    def store_extractions_bulk(self, rows: List[Tuple[str, str, Dict[str, Any]]]) -> List[str]:
+        """
+        Store several agent extractions in a single transaction.
+        
+        Args:
+            rows: (conversation_id, agent, data) tuples
+            
+        Returns:
+            List of extraction IDs, in row order
+        """
+        if not rows:
+            return []
+        
+        timestamp = self.get_timestamp()
+        seq = self._next_seq(len(rows))
+        extraction_ids = [_new_id() for _ in rows]
+        params = [
+            (extraction_id, conversation_id, agent, timestamp, _pack(data), seq + offset)
+            for offset, (extraction_id, (conversation_id, agent, data)) in enumerate(zip(extraction_ids, rows))
+        ]
+        
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                _SQL_INSERT_EXTRACTION,
+                params
+            )
+        
+        return [record_id.hex() for record_id in extraction_ids]
     
     def store_result(self, conversation_id: str, result: Dict[str, Any]) -> str:
         """Store final processing result."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        result_id = _new_id()
         
-        result_id = str(uuid.uuid4())
-        cursor.execute(
-            """
-            INSERT INTO results (id, conversation_id, format_type, intent, timestamp, data) 
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                result_id,
-                conversation_id,
-                result.get("format_type", ""),
-                result.get("intent", ""),
-                self.get_timestamp(),
-                json.dumps(result)
+        with self._lock:
+            self._connection().execute(
+                _SQL_INSERT_RESULT,
+                (
+                    result_id,
+                    conversation_id,
+                    result.get("format_type", ""),
+                    result.get("intent", ""),
+                    self.get_timestamp(),
+                    _pack(result),
+                    self._next_seq()
+                )
             )
-        )
         
-        conn.commit()
-        conn.close()
-        return result_id
+        return result_id.hex()
     
     def store_action(self, conversation_id: str, chain_id: str, action_id: str, 
-                     status: str, result: Dict[str, Any]) -> str:
-        """Store a triggered action from an action chain."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+                     status: str, result: Dict[str, Any], record_id: Optional[str] = None) -> str:
+        """
+        Store a triggered action from an action chain.
         
-        action_record_id = str(uuid.uuid4())
+        Args:
+            conversation_id: Conversation the action belongs to
+            chain_id: Action chain that triggered it
+            action_id: Action name within the chain
+            status: Action status, e.g. "pending" or "completed"
+            result: Action result
+            record_id: ID returned by an earlier store_action call. The stored
+                action is moved to the new status and result in one upsert
+                instead of a separate update_action_status round trip.
+            
+        Returns:
+            Action record ID
+        """
+        action_record_id = _id_from_api(record_id) if record_id else _new_id()
         timestamp = self.get_timestamp()
         
-        cursor.execute(
-            """
-            INSERT INTO actions 
-            (id, conversation_id, chain_id, action_id, status, triggered_at, completed_at, result) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        with self._lock:
+            self._connection().execute(
+                _SQL_INSERT_ACTION,
+                (
+                    action_record_id,
+                    conversation_id,
+                    chain_id,
+                    action_id,
+                    status,
+                    timestamp,
+                    timestamp if status in ["completed", "failed"] else None,
+                    _pack(result),
+                    self._next_seq()
+                )
+            )
+        
+        return _id_to_api(action_record_id)
+    
+    def store_actions_bulk(self, rows: List[Tuple[str, str, str, str, Dict[str, Any]]]) -> List[str]:
+        """
+        Store several triggered actions in a single transaction.
+        
+        Args:
+            rows: (conversation_id, chain_id, action_id, status, result) tuples
+            
+        Returns:
+            List of action record IDs, in row order
+        """
+        if not rows:
+            return []
+        
+        timestamp = self.get_timestamp()
+        seq = self._next_seq(len(rows))
+        record_ids = [_new_id() for _ in rows]
+        params = [
             (
-                action_record_id,
+                record_id,
                 conversation_id,
                 chain_id,
                 action_id,
                 status,
                 timestamp,
                 timestamp if status in ["completed", "failed"] else None,
-                json.dumps(result)
+                _pack(result),
+                seq + offset
+            )
+            for offset, (record_id, (conversation_id, chain_id, action_id, status, result)) in enumerate(zip(record_ids, rows))
+        ]
+        
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                _SQL_INSERT_ACTION,
+                params
             )
-        )
         
-        conn.commit()
-        conn.close()
-        return action_record_id
+        return [record_id.hex() for record_id in record_ids]
     
     def update_action_status(self, action_id: str, status: str, result: Dict[str, Any] = None) -> bool:
         """Update the status of a previously stored action."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if result is not None:
-            cursor.execute(
-                """
-                UPDATE actions 
-                SET status = ?, completed_at = ?, result = ?
-                WHERE id = ?
-                """,
-                (
-                    status,
-                    self.get_timestamp(),
-                    json.dumps(result),
-                    action_id
+        with self._lock:
+            conn = self._connection()
+            
+            if result is not None:
+                cursor = conn.execute(
+                    _SQL_UPDATE_ACTION_RESULT,
+                    (
+                        status,
+                        self.get_timestamp(),
+                        _pack(result),
+                        _id_from_api(action_id)
+                    )
                 )
-            )
-        else:
-            cursor.execute(
-                """
-                UPDATE actions 
-                SET status = ?, completed_at = ?
-                WHERE id = ?
-                """,
-                (
-                    status,
-                    self.get_timestamp() if status in ["completed", "failed"] else None,
-                    action_id
+            else:
+                cursor = conn.execute(
+                    _SQL_UPDATE_ACTION_STATUS,
+                    (
+                        status,
+                        self.get_timestamp() if status in ["completed", "failed"] else None,
+                        _id_from_api(action_id)
+                    )
                 )
-            )
-        
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
-        return affected_rows > 0
+            
+            return cursor.rowcount > 0
     
     def store_decision_trace(self, conversation_id: str, agent: str, decision_data: Dict[str, Any]) -> str:
         """Store an agent's decision-making trace."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        trace_id = _new_id()
         
-        trace_id = str(uuid.uuid4())
-        cursor.execute(
-            """
-            INSERT INTO decision_traces 
-            (id, conversation_id, agent, decision_point, reasoning, alternatives, selected_option, confidence, timestamp) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                trace_id,
-                conversation_id,
-                agent,
-                decision_data.get("decision_point", ""),
-                decision_data.get("reasoning", ""),
-                json.dumps(decision_data.get("alternatives", [])),
-                decision_data.get("selected_option", ""),
-                decision_data.get("confidence", 0.0),
-                self.get_timestamp()
+        with self._lock:
+            self._connection().execute(
+                _SQL_INSERT_DECISION_TRACE,
+                (
+                    trace_id,
+                    conversation_id,
+                    agent,
+                    decision_data.get("decision_point", ""),
+                    decision_data.get("reasoning", ""),
+                    _dumps(decision_data.get("alternatives", [])),
+                    decision_data.get("selected_option", ""),
+                    decision_data.get("confidence", 0.0),
+                    self.get_timestamp(),
+                    self._next_seq()
+                )
             )
-        )
         
-        conn.commit()
-        conn.close()
-        return trace_id
+        return trace_id.hex()
     
     def store_alert(self, conversation_id: str, alert_data: Dict[str, Any]) -> str:
         """Store an alert generated by the system."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        alert_id = _new_id()
         
-        alert_id = str(uuid.uuid4())
-        cursor.execute(
-            """
-            INSERT INTO alerts 
-            (id, conversation_id, alert_type, severity, message, source, timestamp, data) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                alert_id,
-                conversation_id,
-                alert_data.get("type", ""),
-                alert_data.get("severity", "medium"),
-                alert_data.get("message", ""),
-                alert_data.get("source", ""),
-                self.get_timestamp(),
-                json.dumps(alert_data.get("data", {}))
+        with self._lock:
+            self._connection().execute(
+                _SQL_INSERT_ALERT,
+                (
+                    alert_id,
+                    conversation_id,
+                    alert_data.get("type", ""),
+                    alert_data.get("severity", "medium"),
+                    alert_data.get("message", ""),
+                    alert_data.get("source", ""),
+                    self.get_timestamp(),
+                    _pack(alert_data.get("data", {})),
+                    self._next_seq()
+                )
             )
-        )
         
-        conn.commit()
-        conn.close()
-        return alert_id
-    
-    def get_conversation_history(self, conversation_id: str) -> List[Dict[str, Any]]:
-        """Get all activities for a specific conversation in chronological order."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Get all relevant data from tables
-        tables_and_types = {
-            "metadata": "metadata",
-            "extractions": "extraction", 
-            "results": "result",
-            "actions": "action",
-            "decision_traces": "decision_trace",
-            "alerts": "alert"
+        return alert_id.hex()
+    
+    def _build_history_query(self, conn: sqlite3.Connection) -> None:
+        """
+        Build the single UNION ALL query behind get_conversation_history. Each
+        branch projects the union of all tables' columns (NULL where a table
+        lacks one) so the branches line up; rows keep only their own columns.
+        """
+        columns = {
+            table: [info[1] for info in conn.execute(f"PRAGMA table_info({table})")]
+            for table, _ in _HISTORY_SOURCES
         }
+        all_columns = list(dict.fromkeys(c for table_columns in columns.values() for c in table_columns))
         
-        history = []
+        selects = []
+        for ordinal, (table, activity_type) in enumerate(_HISTORY_SOURCES):
+            own = set(columns[table])
+            projection = ", ".join(c if c in own else f"NULL AS {c}" for c in all_columns)
+            time_column = "triggered_at" if table == "actions" else "timestamp"
+            selects.append(
+                f"SELECT '{activity_type}', COALESCE({time_column}, '') AS ts, {ordinal} AS ord, "
+                f"rowid AS rid, {projection} FROM {table} WHERE conversation_id = ?"
+            )
         
-        for table, activity_type in tables_and_types.items():
-            cursor.execute(f"SELECT * FROM {table} WHERE conversation_id = ?", (conversation_id,))
-            rows = cursor.fetchall()
+        # Order by seq; rows without one (written before the column existed)
+        # come first by time, ties keep table order, then insertion order
+        self._history_sql = " UNION ALL ".join(selects) + " ORDER BY seq, ts, ord, rid"
+        self._history_params = len(selects)
+        self._history_columns = {
+            activity_type: tuple((c, 4 + all_columns.index(c)) for c in columns[table])
+            for table, activity_type in _HISTORY_SOURCES
+        }
+    
+    def get_conversation_history(self, conversation_id: str, parse: bool = False) -> List[LazyJSONRow]:
+        """
+        Get all activities for a specific conversation in chronological order.
+        
+        Args:
+            conversation_id: Conversation to read
+            parse: Parse every row's JSON column before returning, in one
+                batch. Otherwise each row parses its JSON when first read.
             
-            for row in rows:
-                item = dict(row)
-                item["activity_type"] = activity_type
-                
-                # Parse JSON fields based on table
-                if table == "actions":
-                    item["result"] = json.loads(item["result"]) if item["result"] else {}
-                elif table == "decision_traces":
-                    item["alternatives"] = json.loads(item["alternatives"]) if item["alternatives"] else []
-                else:
-                    if "data" in item:
-                        item["data"] = json.loads(item["data"])
-                
-                history.append(item)
+        Returns:
+            History rows
+        """
+        history = []
         
-        conn.close()
+        # Rows are consumed as SQLite produces them
+        cursor = self._read_connection().execute(
+            self._history_sql, (conversation_id,) * self._history_params
+        )
+        for row in cursor:
+            activity_type = row[0]
+            item = {name: row[index] for name, index in self._history_columns[activity_type]}
+            item["id"] = _id_to_api(item["id"])
+            item["activity_type"] = activity_type
+            history.append(LazyJSONRow(item, _HISTORY_JSON_COLUMNS[activity_type]))
         
-        # Sort by timestamp
-        history.sort(key=lambda x: x.get("timestamp") or x.get("triggered_at", ""))
+        if parse:
+            LazyJSONRow.parse_all(history)
         return history
     
-    def get_latest_extraction(self, conversation_id: str, agent: str) -> Optional[Dict[str, Any]]:
-        """Get the most recent extraction from a specific agent for a conversation."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def get_history_version(self, conversation_id: str) -> Tuple[Any, ...]:
+        """
+        Cheap marker of a conversation's history: it changes whenever rows are
+        added to the conversation or one of its actions completes, without
+        reading any payloads. Callers can use it to key cached derived views.
         
-        cursor.execute(
-            """
-            SELECT * FROM extractions 
-            WHERE conversation_id = ? AND agent = ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-            """,
+        Args:
+            conversation_id: Conversation to check
+            
+        Returns:
+            Hashable tuple of per-table row counts and latest sequence numbers
+        """
+        return tuple(self._read_connection().execute(
+            _SQL_HISTORY_VERSION, (conversation_id,) * len(_SEQ_TABLES)
+        ))
+    
+    def get_latest_extraction(self, conversation_id: str, agent: str) -> Optional[LazyJSONRow]:
+        """Get the most recent extraction from a specific agent for a conversation."""
+        row = self._read_connection().execute(
+            _SQL_LATEST_EXTRACTION,
             (conversation_id, agent)
-        )
-        
-        row = cursor.fetchone()
-        conn.close()
+        ).fetchone()
         
         if row:
-            item = dict(row)
-            item["data"] = json.loads(item["data"])
-            return item
+            item = dict(zip(_EXTRACTION_FIELDS, row))
+            item["id"] = _id_to_api(row[0])
+            return LazyJSONRow(item, _DATA_COLUMN)
         
         return None
     
-    def get_result(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+    def get_result(self, conversation_id: str) -> Optional[LazyJSONRow]:
         """Get the final result for a conversation."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """
-            SELECT * FROM results 
-            WHERE conversation_id = ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-            """,
+        row = self._read_connection().execute(
+            _SQL_LATEST_RESULT,
             (conversation_id,)
-        )
-        
-        row = cursor.fetchone()
-        conn.close()
+        ).fetchone()
         
         if row:
-            item = dict(row)
-            item["data"] = json.loads(item["data"])
-            return item
+            item = dict(zip(_RESULT_FIELDS, row))
+            item["id"] = _id_to_api(row[0])
+            return LazyJSONRow(item, _DATA_COLUMN)
         
         return None
     
-    def get_action_history(self, conversation_id: str) -> List[Dict[str, Any]]:
+    def get_action_history(self, conversation_id: str) -> List[ActionRow]:
         """Get all actions for a specific conversation."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT * FROM actions WHERE conversation_id = ? ORDER BY triggered_at ASC",
+        cursor = self._read_connection().execute(
+            _SQL_ACTION_HISTORY,
             (conversation_id,)
         )
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
         return [
-            {**dict(row), "result": json.loads(row["result"]) if row["result"] else {}}
-            for row in rows
+            ActionRow(_id_to_api(record_id), *columns, _unpack(result) if result else {}, seq)
+            for record_id, *columns, result, seq in cursor
         ]
     
-    def get_decision_traces(self, conversation_id: str, agent: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get decision traces for a conversation, optionally filtered by agent."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def get_decision_traces(self, conversation_id: str, agent: Optional[str] = None,
+                            summary_only: bool = False) -> List[Any]:
+        """
+        Get decision traces for a conversation, optionally filtered by agent.
+        
+        Args:
+            conversation_id: Conversation to read
+            agent: Only return traces from this agent
+            summary_only: Leave out the alternatives list and report only its
+                length (n_alternatives), skipping the JSON parse per row
+            
+        Returns:
+            TraceRow objects in write order, or plain dicts when summary_only
+        """
+        conn = self._read_connection()
+        
+        if summary_only:
+            if agent:
+                cursor = conn.execute(_SQL_DECISION_TRACE_SUMMARIES_BY_AGENT, (conversation_id, agent))
+            else:
+                cursor = conn.execute(_SQL_DECISION_TRACE_SUMMARIES, (conversation_id,))
+            return [
+                dict(zip(_TRACE_SUMMARY_FIELDS, (_id_to_api(row[0]), *row[1:])))
+                for row in cursor
+            ]
         
         if agent:
-            cursor.execute(
-                "SELECT * FROM decision_traces WHERE conversation_id = ? AND agent = ? ORDER BY timestamp ASC",
+            cursor = conn.execute(
+                _SQL_DECISION_TRACES_BY_AGENT,
                 (conversation_id, agent)
             )
         else:
-            cursor.execute(
-                "SELECT * FROM decision_traces WHERE conversation_id = ? ORDER BY timestamp ASC",
+            cursor = conn.execute(
+                _SQL_DECISION_TRACES,
                 (conversation_id,)
             )
         
-        rows = cursor.fetchall()
-        conn.close()
-        
         return [
-            {**dict(row), "alternatives": json.loads(row["alternatives"]) if row["alternatives"] else []}
-            for row in rows
+            TraceRow(_id_to_api(row[0]), *row[1:5], _loads(row[5]) if row[5] else [], *row[6:])
+            for row in cursor
         ]
     
-    def get_alerts(self, conversation_id: str) -> List[Dict[str, Any]]:
+    def get_alerts(self, conversation_id: str) -> List[AlertRow]:
         """Get alerts for a specific conversation."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT * FROM alerts WHERE conversation_id = ? ORDER BY timestamp ASC",
+        cursor = self._read_connection().execute(
+            _SQL_ALERTS,
             (conversation_id,)
         )
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
         return [
-            {**dict(row), "data": json.loads(row["data"]) if row["data"] else {}}
-            for row in rows
+            AlertRow(_id_to_api(record_id), *columns, _unpack(data) if data else {}, seq)
+            for record_id, *columns, data, seq in cursor
         ]
     
     def find_related_inputs(self, conversation_id: str) -> List[str]:
         """Find all inputs related to the current conversation"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT DISTINCT format_type FROM metadata WHERE conversation_id = ?",
+        cursor = self._read_connection().execute(
+            _SQL_RELATED_FORMATS,
             (conversation_id,)
         )
-        formats = [row['format_type'] for row in cursor.fetchall()]
-        conn.close()
-        
-        return formats
+        return [format_type for format_type, in cursor]
 
+    def migrate_payloads(self) -> int:
+        """
+        Rewrite payload columns still stored as JSON text in MessagePack.
+        Rows are readable either way; this only reclaims space and parse time
+        for data written before the switch. Each table is rewritten in its
+        own transaction.
+        
+        Returns:
+            Number of values rewritten
+        """
+        if msgpack is None:
+            return 0
+        
+        migrated = 0
+        for table, column in _PAYLOAD_COLUMNS:
+            with self._lock, self._transaction() as conn:
+                rows = conn.execute(f"SELECT id, {column} FROM {table} WHERE typeof({column}) = 'text'").fetchall()
+                params = []
+                for record_id, text in rows:
+                    packed = _pack(_loads(text))
+                    if isinstance(packed, bytes):
+                        params.append((packed, record_id))
+                conn.executemany(f"UPDATE {table} SET {column} = ? WHERE id = ?", params)
+                migrated += len(params)
+        
+        return migrated
+    
     def merge_results(self, conversation_id: str) -> Optional[Dict[str, Any]]:
-        """Merge results from multiple agents for related inputs"""
-        formats = self.find_related_inputs(conversation_id)
+        """
+        Merge results from multiple agents for related inputs. The related
+        formats and each agent's latest extraction come from one query, and the
+        merged result is stored in the same transaction.
+        """
+        formats = []
+        extractions = {}
         
-        if len(formats) > 1:
+        with self._lock, self._transaction() as conn:
+            for kind, key, data in conn.execute(_SQL_MERGE_SOURCES, (conversation_id, conversation_id)):
+                if kind == 0:
+                    formats.append(key)
+                else:
+                    extractions[key] = data
+            
+            if len(formats) <= 1:
+                return None
+            
             merged_data = {"formats": formats, "merged": True}
+            for agent_name in _MERGED_AGENTS:
+                if agent_name in extractions:
+                    merged_data[f"{agent_name}_data"] = _unpack(extractions[agent_name])
             
-            for agent_name in ["json_agent", "email_agent", "pdf_agent"]:
-                extraction = self.get_latest_extraction(conversation_id, agent_name)
-                if extraction:
-                    merged_data[f"{agent_name}_data"] = extraction["data"]
-                    
             result = {
                 "format_type": "merged",
                 "intent": "composite",
                 "data": merged_data
             }
-            self.store_result(conversation_id, result)
-            
-            return merged_data
+            conn.execute(
+                _SQL_INSERT_RESULT,
+                (
+                    _new_id(),
+                    conversation_id,
+                    result["format_type"],
+                    result["intent"],
+                    self.get_timestamp(),
+                    _pack(result),
+                    self._next_seq()
+                )
+            )
         
-        return None
\ No newline at end of file
+        return merged_data
+
+class ShardedMemoryStore:
+    """
+    MemoryStore split across several SQLite files by conversation. Each shard
+    is a full MemoryStore with its own writer connection and WAL, so writes
+    for conversations on different shards do not wait for each other. Every
+    read is scoped to one conversation and so touches only its shard.
+    Classifications carry no conversation and live on shard 0.
+    """
+    
+    def __init__(self, db_path: str = "agent_memory.db", shards: int = 16, **store_options: Any):
+        """
+        Args:
+            db_path: Base file name; shard i is stored in <name>_<i><ext>
+            shards: Number of shard files
+            store_options: Passed on to each shard's MemoryStore
+        """
+        root, ext = os.path.splitext(db_path)
+        self.shards = [MemoryStore(f"{root}_{index}{ext}", **store_options) for index in range(shards)]
+    
+    def _shard(self, conversation_id: str) -> MemoryStore:
+        digest = hashlib.blake2b(conversation_id.encode(), digest_size=8).digest()
+        return self.shards[int.from_bytes(digest, "big") % len(self.shards)]
+    
+    def _bulk(self, rows: List[Any], conversation_id_of: Callable[[Any], str], method: str) -> List[str]:
+        """Run a bulk write per shard and return the IDs in the original row order."""
+        groups: Dict[int, Tuple[MemoryStore, List[int]]] = {}
+        for position, row in enumerate(rows):
+            shard = self._shard(conversation_id_of(row))
+            groups.setdefault(id(shard), (shard, []))[1].append(position)
+        
+        record_ids: List[Optional[str]] = [None] * len(rows)
+        for shard, positions in groups.values():
+            for position, record_id in zip(positions, getattr(shard, method)([rows[p] for p in positions])):
+                record_ids[position] = record_id
+        return record_ids
+    
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+    
+    def generate_conversation_id(self) -> str:
+        return self.shards[0].generate_conversation_id()
+    
+    def get_timestamp(self) -> str:
+        return self.shards[0].get_timestamp()
+    
+    def add_classification(self, classification: Dict[str, Any]) -> str:
+        return self.shards[0].add_classification(classification)
+    
+    def add_classifications_bulk(self, classifications: List[Dict[str, Any]]) -> List[str]:
+        return self.shards[0].add_classifications_bulk(classifications)
+    
+    def store_metadata(self, metadata: Dict[str, Any]) -> str:
+        return self._shard(metadata.get("conversation_id", "")).store_metadata(metadata)
+    
+    def store_metadata_batch(self, rows: List[Dict[str, Any]]) -> List[str]:
+        return self._bulk(rows, lambda row: row.get("conversation_id", ""), "store_metadata_batch")
+    
+    def store_extraction(self, conversation_id: str, agent: str, data: Dict[str, Any]) -> str:
+        return self._shard(conversation_id).store_extraction(conversation_id, agent, data)
+    
+    def store_extractions_bulk(self, rows: List[Tuple[str, str, Dict[str, Any]]]) -> List[str]:
+        return self._bulk(rows, lambda row: row[0], "store_extractions_bulk")
+    
+    def store_result(self, conversation_id: str, result: Dict[str, Any]) -> str:
+        return self._shard(conversation_id).store_result(conversation_id, result)
+    
+    def store_action(self, conversation_id: str, chain_id: str, action_id: str,
+                     status: str, result: Dict[str, Any], record_id: Optional[str] = None) -> str:
+        return self._shard(conversation_id).store_action(
+            conversation_id, chain_id, action_id, status, result, record_id=record_id
+        )
+    
+    def store_actions_bulk(self, rows: List[Tuple[str, str, str, str, Dict[str, Any]]]) -> List[str]:
+        return self._bulk(rows, lambda row: row[0], "store_actions_bulk")
+    
+    def update_action_status(self, action_id: str, status: str, result: Dict[str, Any] = None) -> bool:
+        # Action record IDs do not encode their conversation, so try each shard
+        return any(shard.update_action_status(action_id, status, result) for shard in self.shards)
+    
+    def store_decision_trace(self, conversation_id: str, agent: str, decision_data: Dict[str, Any]) -> str:
+        return self._shard(conversation_id).store_decision_trace(conversation_id, agent, decision_data)
+    
+    def store_alert(self, conversation_id: str, alert_data: Dict[str, Any]) -> str:
+        return self._shard(conversation_id).store_alert(conversation_id, alert_data)
+    
+    def get_conversation_history(self, conversation_id: str, parse: bool = False) -> List[LazyJSONRow]:
+        return self._shard(conversation_id).get_conversation_history(conversation_id, parse=parse)
+    
+    def get_history_version(self, conversation_id: str) -> Tuple[Any, ...]:
+        return self._shard(conversation_id).get_history_version(conversation_id)
+    
+    def get_latest_extraction(self, conversation_id: str, agent: str) -> Optional[LazyJSONRow]:
+        return self._shard(conversation_id).get_latest_extraction(conversation_id, agent)
+    
+    def get_result(self, conversation_id: str) -> Optional[LazyJSONRow]:
+        return self._shard(conversation_id).get_result(conversation_id)
+    
+    def get_action_history(self, conversation_id: str) -> List[ActionRow]:
+        return self._shard(conversation_id).get_action_history(conversation_id)
+    
+    def get_decision_traces(self, conversation_id: str, agent: Optional[str] = None,
+                            summary_only: bool = False) -> List[Any]:
+        return self._shard(conversation_id).get_decision_traces(conversation_id, agent, summary_only)
+    
+    def get_alerts(self, conversation_id: str) -> List[AlertRow]:
+        return self._shard(conversation_id).get_alerts(conversation_id)
+    
+    def find_related_inputs(self, conversation_id: str) -> List[str]:
+        return self._shard(conversation_id).find_related_inputs(conversation_id)
+    
+    def migrate_payloads(self) -> int:
+        return sum(shard.migrate_payloads() for shard in self.shards)
+    
+    def merge_results(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        return self._shard(conversation_id).merge_results(conversation_id)
+
+def create_memory_store(db_path: str = "agent_memory.db", shards: int = 1) -> Any:
+    """
+    Create the app's memory store.
+    
+    Args:
+        db_path: SQLite database file
+        shards: Split the data across this many files by conversation when above 1
+        
+    Returns:
+        MemoryStore, or ShardedMemoryStore when sharded
+    """
+    if shards > 1:
+        return ShardedMemoryStore(db_path, shards=shards)
+    return MemoryStore(db_path)
+
+class AsyncMemoryStore:
+    """
+    Awaitable access to a MemoryStore for async callers. Calls run on a
+    thread pool so the event loop is not blocked. Reads use the pool threads'
+    own connections and run concurrently; writes still go through the store's
+    single writer connection one at a time. Synchronous callers keep using the
+    wrapped store directly.
+    """
+    
+    def __init__(self, store: Any, max_workers: Optional[int] = None):
+        self.store = store
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count() or 4,
+            thread_name_prefix="memory-store"
+        )
+    
+    def __getattr__(self, name: str) -> Callable:
+        """Return an async version of the store's public method name."""
+        method = getattr(self.store, name)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+        
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+        
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+    
+    def close(self) -> None:
+        """Wait for pending calls, then close the wrapped store."""
+        self._executor.shutdown(wait=True)
+        self.store.close()
@@ -1,5 +1,6 @@
+from dataclasses import dataclass, field
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 
 class InputMetadata(BaseModel):
     source: str
@@ -17,3 +18,69 @@ class MemoryRecord(BaseModel):
 
 class SharedMemoryModel(BaseModel):
     records: Dict[str, MemoryRecord]
+
+class _RowMapping:
+    """
+    Read-only mapping access for slotted row classes, so callers can keep
+    using row["column"], row.get(), dict(row) and {**row}. The dataclasses
+    themselves serialize directly with orjson.
+    """
+    __slots__ = ()
+    
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((key, getattr(self, key)) for key in self.__slots__)
+
+@dataclass(slots=True)
+class ActionRow(_RowMapping):
+    """A row of the actions table with its result parsed."""
+    id: str
+    conversation_id: str
+    chain_id: str
+    action_id: str
+    status: str
+    triggered_at: Optional[str]
+    completed_at: Optional[str]
+    result: Dict[str, Any] = field(default_factory=dict)
+    seq: Optional[int] = None
+
+@dataclass(slots=True)
+class TraceRow(_RowMapping):
+    """A row of the decision_traces table with its alternatives parsed."""
+    id: str
+    conversation_id: str
+    agent: str
+    decision_point: str
+    reasoning: str
+    alternatives: List[Any]
+    selected_option: str
+    confidence: float
+    timestamp: Optional[str]
+    seq: Optional[int] = None
+    n_alternatives: Optional[int] = None
+
+@dataclass(slots=True)
+class AlertRow(_RowMapping):
+    """A row of the alerts table with its data parsed."""
+    id: str
+    conversation_id: str
+    alert_type: str
+    severity: str
+    message: str
+    source: str
+    timestamp: Optional[str]
+    data: Dict[str, Any] = field(default_factory=dict)
+    seq: Optional[int] = None
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import unittest
+from utils.alert_system import AlertSystem
+
+class TestAlertSystem(unittest.TestCase):
+
+    def setUp(self):
+        self.alerts = AlertSystem()
+
+    def test_builtin_rules(self):
+        triggered = self.alerts.check_alerts({
+            "format": "JSON",
+            "intent": "Invoice",
+            "conversation_id": "conv-1",
+            "processed_data": {"flowbit_data": {"total_amount": 5000}, "anomalies": [1, 2, 3]}
+        })
+        self.assertEqual([alert["id"] for alert in triggered], ["invoice_alert", "multiple_anomalies"])
+        self.assertEqual(self.alerts.get_alerts_for_conversation("conv-1"), triggered)
+
+        # A non-numeric amount does not raise, it just does not trigger the rule
+        triggered = self.alerts.check_alerts({
+            "format": "JSON",
+            "intent": "Invoice",
+            "processed_data": {"flowbit_data": {"total_amount": "5000"}}
+        })
+        self.assertEqual(triggered, [])
+
+        # Malformed anomalies without a length do not raise either
+        for anomalies in (5, "abc"):
+            triggered = self.alerts.check_alerts({"format": "JSON", "processed_data": {"anomalies": anomalies}})
+            self.assertEqual(triggered, [])
+
+    def test_recent_alerts_limits(self):
+        for n in range(5):
+            self.alerts.check_alerts({"format": "Email", "conversation_id": f"conv-{n}",
+                                      "processed_data": {"urgency": "High"}})
+        ids = [alert["data_reference"]["conversation_id"] for alert in self.alerts.alerts_history]
+
+        for limit in (3, 10, 0, -1, -10):
+            recent = self.alerts.get_recent_alerts(limit)
+            self.assertEqual([alert["data_reference"]["conversation_id"] for alert in recent], ids[-limit:])
+
+    def test_formats_without_rules_are_skipped(self):
+        self.assertEqual(self.alerts.check_alerts({"format": "CSV", "processed_data": {"urgency": "High"}}), [])
+
+        self.alerts.add_custom_rule("any_format", lambda data: True, "Anything")
+        triggered = self.alerts.check_alerts({"format": "CSV"})
+        self.assertEqual([alert["id"] for alert in triggered], ["any_format"])
+
+    def test_failing_custom_rule_is_skipped(self):
+        self.assertFalse(self.alerts.add_custom_rule("not_callable", None, "never"))
+        self.assertTrue(self.alerts.add_custom_rule("needs_key", lambda data: data["missing"], "broken"))
+        self.assertTrue(self.alerts.add_custom_rule("rfq", lambda data: data.get("intent") == "RFQ", "RFQ received"))
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            triggered = self.alerts.check_alerts({"format": "Email", "intent": "RFQ"})
+        self.assertEqual([alert["id"] for alert in triggered], ["rfq"])
+        self.assertIn("needs_key", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import asyncio
+import time
+import unittest
+from utils.api_client import APIClient
+
+class TestAPIClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = APIClient(simulate=True)
+
+    def test_simulated_responses(self):
+        crm = self.client.post("crm", {"priority": "low"})
+        self.assertTrue(crm["success"])
+        self.assertEqual(crm["status_code"], 201)
+        self.assertEqual(crm["data"]["priority"], "low")
+        self.assertTrue(crm["data"]["case_id"].startswith("CRM-"))
+        self.assertTrue(crm["simulated"])
+
+        risk = self.client.post("risk_alert", {})
+        self.assertEqual(risk["data"]["risk_level"], "high")
+        self.assertTrue(risk["data"]["alert_id"].startswith("RISK-"))
+
+        generic = self.client.post("archive", {})
+        self.assertEqual(generic["status_code"], 200)
+        self.assertEqual(generic["data"]["message"], "Request to archive processed successfully")
+        self.assertNotEqual(generic["request_id"], crm["request_id"])
+
+    def test_simulated_calls_do_not_sleep_by_default(self):
+        start = time.perf_counter()
+        for _ in range(50):
+            self.client.post("ticketing", {})
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_post_many_keeps_order(self):
+        responses = asyncio.run(self.client.post_many([
+            ("crm", {}), ("ticketing", {}), ("compliance", {})
+        ]))
+        self.assertEqual(
+            [responses[0]["data"]["case_id"][:4], responses[1]["data"]["ticket_id"][:4],
+             responses[2]["data"]["alert_id"][:5]],
+            ["CRM-", "TKT-", "COMP-"]
+        )
+
+    def test_post_many_overlaps_simulated_latency(self):
+        client = APIClient(simulate=True, simulate_latency_s=0.2)
+
+        start = time.perf_counter()
+        responses = asyncio.run(client.post_many([("crm", {})] * 5))
+        self.assertEqual(len(responses), 5)
+        self.assertLess(time.perf_counter() - start, 0.6)
+
+if __name__ == '__main__':
+    unittest.main()
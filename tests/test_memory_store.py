@@ -0,0 +1,262 @@
+import asyncio
+import datetime
+import os
+import tempfile
+import threading
+import unittest
+from memory.memory_store import AsyncMemoryStore, MemoryStore, ShardedMemoryStore, _inherited_connections
+
+class TestMemoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = MemoryStore(os.path.join(self.tmpdir.name, "memory.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_extraction_round_trip(self):
+        self.store.store_extraction("conv-1", "json_agent", {"total": 10})
+        self.store.store_extraction("conv-1", "json_agent", {"total": 20})
+
+        latest = self.store.get_latest_extraction("conv-1", "json_agent")
+        self.assertEqual(latest["data"], {"total": 20})
+        self.assertIsNone(self.store.get_latest_extraction("conv-1", "email_agent"))
+
+    def test_non_string_keys_read_back_as_json_would(self):
+        self.store.store_extraction("conv-1", "json_agent", {1: "a", "items": [{None: True, 2.5: "b"}]})
+
+        latest = self.store.get_latest_extraction("conv-1", "json_agent")
+        self.assertEqual(latest["data"], {"1": "a", "items": [{"null": True, "2.5": "b"}]})
+
+    def test_action_status_update(self):
+        record_id = self.store.store_action("conv-1", "chain", "notify", "pending", {"step": 1})
+
+        self.assertTrue(self.store.update_action_status(record_id, "completed", {"step": 2}))
+        self.assertFalse(self.store.update_action_status("missing", "completed"))
+
+        actions = self.store.get_action_history("conv-1")
+        self.assertEqual(len(actions), 1)
+        self.assertEqual(actions[0]["id"], record_id)
+        self.assertEqual(actions[0]["status"], "completed")
+        self.assertEqual(actions[0]["result"], {"step": 2})
+
+    def test_action_upsert(self):
+        record_id = self.store.store_action("conv-1", "chain", "notify", "pending", {})
+        self.assertEqual(
+            self.store.store_action("conv-1", "chain", "notify", "completed", {"ok": True}, record_id=record_id),
+            record_id
+        )
+
+        actions = self.store.get_action_history("conv-1")
+        self.assertEqual(len(actions), 1)
+        self.assertEqual(actions[0]["status"], "completed")
+        self.assertEqual(actions[0]["result"], {"ok": True})
+        self.assertIsNotNone(actions[0]["completed_at"])
+
+    def test_bulk_writes(self):
+        metadata_ids = self.store.store_metadata_batch([
+            {"conversation_id": "conv-1", "format_type": "JSON"},
+            {"conversation_id": "conv-1", "format_type": "Email"}
+        ])
+        action_ids = self.store.store_actions_bulk([
+            ("conv-1", "chain", "a", "completed", {}),
+            ("conv-1", "chain", "b", "completed", {})
+        ])
+
+        extraction_ids = self.store.store_extractions_bulk([
+            ("conv-1", "json_agent", {"total": 1}),
+            ("conv-1", "email_agent", {"subject": "hi"})
+        ])
+        classification_ids = self.store.add_classifications_bulk([
+            {"format": "JSON", "intent": "Invoice"},
+            {"format": "Email", "intent": "RFQ"}
+        ])
+
+        self.assertEqual(len(metadata_ids), 2)
+        self.assertEqual(len(action_ids), 2)
+        self.assertEqual(len(set(extraction_ids + classification_ids)), 4)
+        self.assertEqual(self.store.get_latest_extraction("conv-1", "email_agent")["data"], {"subject": "hi"})
+        self.assertEqual(sorted(self.store.find_related_inputs("conv-1")), ["Email", "JSON"])
+        self.assertEqual([a["action_id"] for a in self.store.get_action_history("conv-1")], ["a", "b"])
+
+    def test_conversation_history(self):
+        self.store.store_metadata({"conversation_id": "conv-1", "format_type": "JSON",
+                                   "timestamp": "2024-01-01T00:00:00"})
+        self.store.store_extraction("conv-1", "json_agent", {"total": 10})
+        self.store.store_decision_trace("conv-1", "json_agent", {"alternatives": ["a", "b"]})
+        self.store.store_alert("conv-1", {"type": "high_value", "data": {"amount": 10}})
+        self.store.store_action("conv-1", "chain", "notify", "completed", {"ok": True})
+        self.store.store_extraction("conv-2", "json_agent", {"total": 99})
+
+        history = self.store.get_conversation_history("conv-1")
+        self.assertEqual(
+            [item["activity_type"] for item in history],
+            ["metadata", "extraction", "decision_trace", "alert", "action"]
+        )
+        self.assertEqual(history[1]["data"], {"total": 10})
+        self.assertEqual(history[2]["alternatives"], ["a", "b"])
+        self.assertEqual(history[3]["data"], {"amount": 10})
+        self.assertEqual(history[4]["result"], {"ok": True})
+
+    def test_history_rows_parse_json_on_access(self):
+        self.store.store_extraction("conv-1", "json_agent", {"total": 10})
+
+        item = self.store.get_conversation_history("conv-1")[0]
+        self.assertEqual(item["agent"], "json_agent")
+        self.assertEqual(item.get("data"), {"total": 10})
+        self.assertEqual(dict(item)["data"], {"total": 10})
+
+        self.store.store_action("conv-1", "chain", "notify", "completed", {})
+        parsed = self.store.get_conversation_history("conv-1", parse=True)
+        self.assertEqual([dict(row) for row in parsed], [dict(row) for row in self.store.get_conversation_history("conv-1")])
+
+    def test_history_keeps_write_order_for_equal_timestamps(self):
+        for format_type in ("PDF", "JSON", "Email"):
+            self.store.store_metadata({"conversation_id": "conv-1", "format_type": format_type,
+                                       "timestamp": "2024-01-01T00:00:00"})
+
+        history = self.store.get_conversation_history("conv-1")
+        self.assertEqual([item["format_type"] for item in history], ["PDF", "JSON", "Email"])
+        self.assertEqual(sorted(item["seq"] for item in history), [item["seq"] for item in history])
+
+    def test_history_version(self):
+        empty = self.store.get_history_version("conv-1")
+        record_id = self.store.store_action("conv-1", "chain", "notify", "pending", {})
+        added = self.store.get_history_version("conv-1")
+        self.store.store_extraction("conv-2", "json_agent", {})
+
+        self.assertNotEqual(empty, added)
+        self.assertEqual(self.store.get_history_version("conv-1"), added)
+        self.store.update_action_status(record_id, "completed", {"ok": True})
+        self.assertNotEqual(self.store.get_history_version("conv-1"), added)
+
+    def test_decision_trace_summaries(self):
+        self.store.store_decision_trace("conv-1", "json_agent", {"alternatives": ["a", "b", "c"]})
+        self.store.store_decision_trace("conv-1", "email_agent", {})
+
+        summaries = self.store.get_decision_traces("conv-1", summary_only=True)
+        self.assertEqual([trace["n_alternatives"] for trace in summaries], [3, 0])
+        self.assertNotIn("alternatives", summaries[0])
+        self.assertEqual(self.store.get_decision_traces("conv-1", "json_agent")[0]["alternatives"], ["a", "b", "c"])
+
+    def test_migrate_payloads(self):
+        # MessagePack cannot encode datetimes, so this payload is stored as JSON text
+        self.store.store_extraction("conv-1", "json_agent", {"at": datetime.datetime(2024, 1, 1)})
+        self.store.store_extraction("conv-1", "email_agent", {"subject": "hi"})
+
+        self.assertEqual(self.store.migrate_payloads(), 1)
+        self.assertEqual(self.store.migrate_payloads(), 0)
+        self.assertEqual(self.store.get_latest_extraction("conv-1", "json_agent")["data"], {"at": "2024-01-01T00:00:00"})
+        self.assertEqual(self.store.get_latest_extraction("conv-1", "email_agent")["data"], {"subject": "hi"})
+
+    def test_merge_results(self):
+        self.store.store_metadata({"conversation_id": "conv-1", "format_type": "JSON"})
+        self.store.store_extraction("conv-1", "json_agent", {"total": 10})
+        self.assertIsNone(self.store.merge_results("conv-1"))
+
+        self.store.store_metadata({"conversation_id": "conv-1", "format_type": "Email"})
+        self.store.store_extraction("conv-1", "email_agent", {"subject": "old"})
+        self.store.store_extraction("conv-1", "email_agent", {"subject": "new"})
+
+        merged = self.store.merge_results("conv-1")
+        self.assertEqual(sorted(merged["formats"]), ["Email", "JSON"])
+        self.assertEqual(merged["json_agent_data"], {"total": 10})
+        self.assertEqual(merged["email_agent_data"], {"subject": "new"})
+        self.assertNotIn("pdf_agent_data", merged)
+        self.assertEqual(self.store.get_result("conv-1")["data"]["data"], merged)
+
+    def test_concurrent_writes(self):
+        def write(n):
+            for i in range(20):
+                self.store.store_extraction("conv-1", f"agent_{n}", {"i": i})
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        history = self.store.get_conversation_history("conv-1")
+        self.assertEqual(len(history), 80)
+
+    def test_reader_connections_of_exited_threads_are_closed(self):
+        self.store.store_extraction("conv-1", "json_agent", {"total": 10})
+
+        for _ in range(10):
+            thread = threading.Thread(target=self.store.get_conversation_history, args=("conv-1",))
+            thread.start()
+            thread.join()
+
+        self.store.get_conversation_history("conv-1")
+        self.assertLessEqual(len(self.store._reader_conns), 2)
+
+    def test_construction_opens_no_writer(self):
+        self.assertIsNone(self.store._conn)
+        self.assertIsNone(self.store._checkpoint_thread)
+
+        self.store.store_extraction("conv-1", "json_agent", {"total": 10})
+        self.assertIsNotNone(self.store._conn)
+        self.assertTrue(self.store._checkpoint_thread.is_alive())
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork()")
+    def test_forked_child_writes_on_its_own_connection(self):
+        self.store.store_extraction("conv-1", "json_agent", {"total": 10})
+        self.store.get_conversation_history("conv-1")
+        inherited = [self.store._conn, self.store._readers.conn]
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                self.store.store_extraction("conv-1", "json_agent", {"total": 20})
+                self.store.get_conversation_history("conv-1")
+                if self.store._conn in inherited or self.store._readers.conn in inherited:
+                    status = 2
+                elif not all(conn in _inherited_connections for conn in inherited):
+                    status = 3
+                else:
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        latest = self.store.get_latest_extraction("conv-1", "json_agent")
+        self.assertEqual(latest["data"], {"total": 20})
+
+    def test_async_store(self):
+        async_store = AsyncMemoryStore(self.store, max_workers=4)
+
+        async def run():
+            await asyncio.gather(*(
+                async_store.store_extraction("conv-1", f"agent_{n}", {"n": n}) for n in range(8)
+            ))
+            return await asyncio.gather(*(
+                async_store.get_latest_extraction("conv-1", f"agent_{n}") for n in range(8)
+            ))
+
+        latest = asyncio.run(run())
+        self.assertEqual([item["data"] for item in latest], [{"n": n} for n in range(8)])
+        async_store.close()
+
+    def test_sharded_store(self):
+        sharded = ShardedMemoryStore(os.path.join(self.tmpdir.name, "sharded.db"), shards=4)
+        conversation_ids = [f"conv-{n}" for n in range(8)]
+
+        metadata_ids = sharded.store_metadata_batch([
+            {"conversation_id": conversation_id, "format_type": "JSON"} for conversation_id in conversation_ids
+        ])
+        for conversation_id in conversation_ids:
+            sharded.store_extraction(conversation_id, "json_agent", {"id": conversation_id})
+
+        for metadata_id, conversation_id in zip(metadata_ids, conversation_ids):
+            history = sharded.get_conversation_history(conversation_id)
+            self.assertEqual([item["id"] for item in history][:1], [metadata_id])
+            self.assertEqual(history[1]["data"], {"id": conversation_id})
+        self.assertGreater(len({id(sharded._shard(c)) for c in conversation_ids}), 1)
+        sharded.close()
+
+if __name__ == '__main__':
+    unittest.main()
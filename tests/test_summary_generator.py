@@ -0,0 +1,52 @@
+import unittest
+from utils.summary_generator import SummaryGenerator
+
+class TestSummaryGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = SummaryGenerator()
+
+    def test_email_and_json_summaries(self):
+        self.assertEqual(
+            self.generator.generate_email_summary({"sender_name": "Ann", "sender_email": "ann@example.com",
+                                                   "intent": "RFQ"}),
+            "Email from Ann (ann@example.com)\nIntent: RFQ\nUrgency: Low\n"
+        )
+        self.assertEqual(
+            self.generator.generate_json_summary({"flowbit_data": {"order_id": "O-1", "customer": "Acme",
+                                                                   "items": [1, 2], "total_amount": 5},
+                                                  "anomalies": ["missing field"]}),
+            "Order O-1 from Acme\nContains 2 items for 5 USD\nDetected 1 anomalies\n"
+        )
+
+    def test_pdf_summary_truncates_long_snippets_only(self):
+        summary = self.generator.generate_pdf_summary(
+            {"document_type": "invoice", "has_tables": True, "text_length": 5, "text_snippet": "Hello"}
+        )
+        self.assertEqual(summary, "Invoice document (5 chars)\nContains tabular data\nPreview: Hello\n")
+
+        summary = self.generator.generate_pdf_summary({"text_snippet": "x" * 150})
+        self.assertTrue(summary.endswith("Preview: " + "x" * 100 + "...\n"))
+
+    def test_conversation_summary(self):
+        history = [
+            {"format": "PDF", "intent": "Invoice", "timestamp": "2024-01-01T10:00:00"},
+            {"format": "JSON", "intent": "RFQ", "timestamp": "2024-01-02T10:00:00"},
+            {"format": "PDF", "intent": None, "timestamp": "2024-01-03T10:00:00"},
+            {"format": "Email", "intent": "Invoice", "timestamp": "2024-01-04T10:00:00"}
+        ]
+
+        summary = self.generator.generate_conversation_summary(history)
+        self.assertEqual(summary, (
+            "Conversation with 4 events\n"
+            "Formats: PDF, JSON, Email\n"
+            "Intents: Invoice, RFQ\n"
+            "\nKey events:\n"
+            "- 2024-01-02: JSON with RFQ intent\n"
+            "- 2024-01-03: PDF with None intent\n"
+            "- 2024-01-04: Email with Invoice intent\n"
+        ))
+        self.assertEqual(self.generator.generate_conversation_summary([]), "No conversation history available.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from utils.validators import compile_json_validator, validate_json_batch, validate_json_structure
+
+class TestValidators(unittest.TestCase):
+
+    def test_validate_json_structure(self):
+        required = ["order_id", "customer", "total_amount"]
+
+        self.assertEqual(validate_json_structure({"order_id": 1, "customer": "Acme", "total_amount": 5}, required),
+                         (True, "JSON structure is valid."))
+        self.assertEqual(validate_json_structure({"customer": "Acme"}, required),
+                         (False, "Missing required fields: order_id, total_amount"))
+        self.assertEqual(validate_json_structure(["order_id"], required),
+                         (False, "Input data is not a valid JSON object."))
+
+    def test_compiled_validator_is_reusable(self):
+        validate = compile_json_validator(["amount", "currency"])
+
+        self.assertTrue(validate({"amount": 1, "currency": "USD", "extra": None})[0])
+        self.assertEqual(validate({"currency": "USD"})[1], "Missing required fields: amount")
+
+    def test_validate_json_batch(self):
+        results = validate_json_batch([{"amount": 1}, {}, None], ["amount"])
+        self.assertEqual([is_valid for is_valid, _ in results], [True, False, False])
+        self.assertEqual(results[1][1], "Missing required fields: amount")
+
+if __name__ == '__main__':
+    unittest.main()
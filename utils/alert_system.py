@@ -1,73 +1,156 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+from itertools import islice
 import datetime
-import json
+
+from utils.result_view import ResultView, extract_views
+
+def _exceeds(value: Any, limit: float) -> bool:
+    """value > limit, treating values that cannot be compared as not exceeding it."""
+    try:
+        return value > limit
+    except TypeError:
+        return False
 
 class AlertSystem:
     """Alert system that triggers notifications based on content patterns and thresholds."""
     
-    def __init__(self):
+    __slots__ = ("alert_rules", "alerts_history", "_alerts_by_conv", "_rules_by_key",
+                 "_interesting_formats", "_interesting_intents")
+    
+    def __init__(self, history_size: int = 10_000):
+        # Conditions take the result and its ResultView and must not raise;
+        # custom conditions are guarded when they are added. A rule's optional
+        # "format" and "intent" restrict it to results with those values, so
+        # check_alerts only runs the rules that can apply.
         self.alert_rules = {
             "urgent_email": {
-                "condition": lambda data: data.get("format") == "Email" and 
-                             data.get("processed_data", {}).get("urgency") == "High",
+                "format": "Email",
+                "condition": lambda data, view: view.urgency == "High",
                 "message": "Urgent email received that requires immediate attention",
                 "level": "high"
             },
             "invoice_alert": {
-                "condition": lambda data: data.get("format") == "JSON" and 
-                             data.get("intent") == "Invoice" and
-                             data.get("processed_data", {}).get("flowbit_data", {}).get("total_amount", 0) > 1000,
+                "format": "JSON",
+                "intent": "Invoice",
+                "condition": lambda data, view: view.total_amount is not None and _exceeds(view.total_amount, 1000),
                 "message": "High-value invoice detected",
                 "level": "medium"
             },
             "pdf_regulation": {
-                "condition": lambda data: data.get("format") == "PDF" and 
-                             data.get("intent") == "Regulation",
+                "format": "PDF",
+                "intent": "Regulation",
+                "condition": lambda data, view: True,
                 "message": "Regulatory document received that requires compliance review",
                 "level": "medium"
             },
             "multiple_anomalies": {
-                "condition": lambda data: data.get("format") == "JSON" and 
-                             len(data.get("processed_data", {}).get("anomalies", [])) >= 3,
+                "format": "JSON",
+                "condition": lambda data, view: isinstance(view.anomalies, (list, tuple)) and len(view.anomalies) >= 3,
                 "message": "Multiple anomalies detected in JSON data",
                 "level": "high"
             }
         }
-        self.alerts_history = []
+        # Most recent alerts, oldest first, plus the same alerts per conversation
+        self.alerts_history = deque(maxlen=history_size)
+        self._alerts_by_conv: Dict[Any, deque] = {}
         
+        # (format, intent) -> applicable (rule_id, rule) pairs in rule order
+        self._rules_by_key: Dict[Tuple[Any, Any], List[Tuple[str, Dict[str, Any]]]] = {}
+        self._index_interests()
+    
+    def _index_interests(self) -> None:
+        """
+        Record which formats and intents any rule can match, so check_alerts can
+        return early for other results. None means some rule matches any value.
+        """
+        rules = self.alert_rules.values()
+        self._interesting_formats = (
+            frozenset(rule["format"] for rule in rules) if all("format" in rule for rule in rules) else None
+        )
+        self._interesting_intents = (
+            frozenset(rule["intent"] for rule in rules) if all("intent" in rule for rule in rules) else None
+        )
+    
+    def _rules_for(self, format_type: Any, intent: Any) -> List[Tuple[str, Dict[str, Any]]]:
+        """Rules whose format and intent filters admit a result, built once per pair."""
+        key = (format_type, intent)
+        rules = self._rules_by_key.get(key)
+        if rules is None:
+            rules = self._rules_by_key[key] = [
+                (rule_id, rule) for rule_id, rule in self.alert_rules.items()
+                if rule.get("format", format_type) == format_type and rule.get("intent", intent) == intent
+            ]
+        return rules
 
-    def check_alerts(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def check_alerts(self, data: Dict[str, Any], ctx: Optional[ResultView] = None) -> List[Dict[str, Any]]:
         """
         Check if the processed data triggers any alerts.
         
         Args:
             data: The processed data to check against alert rules
+            ctx: Optional precomputed view of data
             
         Returns:
             List of triggered alerts
         """
+        # No rule can apply to this format or intent
+        if ctx is not None:
+            raw_format, raw_intent = ctx.format, ctx.intent
+        else:
+            raw_format, raw_intent = data.get("format"), data.get("intent")
+        if (self._interesting_formats is not None and raw_format not in self._interesting_formats) or \
+                (self._interesting_intents is not None and raw_intent not in self._interesting_intents):
+            return []
+        
         triggered_alerts = []
+        if ctx is not None:
+            format_type = ctx.format if ctx.format is not None else "Unknown"
+            intent = ctx.intent if ctx.intent is not None else "Unknown"
+        else:
+            format_type = data.get("format", "Unknown")
+            intent = data.get("intent", "Unknown")
+            ctx = extract_views(data)
+        conversation_id = ctx.conversation_id
         
-        for rule_id, rule in self.alert_rules.items():
-            try:
-                if rule["condition"](data):
-                    alert = {
-                        "id": rule_id,
-                        "message": rule["message"],
-                        "level": rule["level"],
-                        "timestamp": datetime.datetime.now().isoformat(),
-                        "data": {
-                            "format": data.get("format", "Unknown"),
-                            "intent": data.get("intent", "Unknown")
-                        }
+        # Shared by every alert this call raises; read on the first one
+        timestamp = None
+        
+        for rule_id, rule in self._rules_for(ctx.format, ctx.intent):
+            if rule["condition"](data, ctx):
+                if timestamp is None:
+                    timestamp = datetime.datetime.now().isoformat()
+                alert = {
+                    "id": rule_id,
+                    "message": rule["message"],
+                    "level": rule["level"],
+                    "timestamp": timestamp,
+                    "data": {
+                        "format": format_type,
+                        "intent": intent
+                    },
+                    "data_reference": {
+                        "conversation_id": conversation_id
                     }
-                    triggered_alerts.append(alert)
-                    self.alerts_history.append(alert)
-            except Exception as e:
-                print(f"Error checking rule {rule_id}: {str(e)}")
+                }
+                triggered_alerts.append(alert)
+                self._record(alert, conversation_id)
         
         return triggered_alerts
     
+    def _record(self, alert: Dict[str, Any], conversation_id: Any) -> None:
+        """Append an alert to the history and its conversation's index."""
+        if len(self.alerts_history) == self.alerts_history.maxlen:
+            # The oldest alert is about to be dropped; it is also the oldest of its conversation
+            evicted = self.alerts_history[0]["data_reference"]["conversation_id"]
+            bucket = self._alerts_by_conv[evicted]
+            bucket.popleft()
+            if not bucket:
+                del self._alerts_by_conv[evicted]
+        
+        self.alerts_history.append(alert)
+        self._alerts_by_conv.setdefault(conversation_id, deque()).append(alert)
+    
     def add_custom_rule(self, rule_id: str, condition, message: str, level: str = "medium") -> bool:
         """
         Add a custom alert rule.
@@ -81,14 +164,24 @@ class AlertSystem:
         Returns:
             Success indicator
         """
-        if rule_id in self.alert_rules:
+        if rule_id in self.alert_rules or not callable(condition):
             return False
         
+        def guarded(data, view):
+            # Custom conditions are arbitrary code, so a failure only skips this rule
+            try:
+                return condition(data)
+            except Exception as e:
+                print(f"Error checking rule {rule_id}: {str(e)}")
+                return False
+        
         self.alert_rules[rule_id] = {
-            "condition": condition,
+            "condition": guarded,
             "message": message,
             "level": level
         }
+        self._rules_by_key.clear()
+        self._index_interests()
         return True
     
     def get_recent_alerts(self, limit: int = 10) -> List[Dict[str, Any]]:
@@ -101,7 +194,13 @@ class AlertSystem:
         Returns:
             List of recent alerts
         """
-        return self.alerts_history[-limit:]
+        if limit <= 0:
+            # Same result as slicing the history with [-limit:]
+            return list(self.alerts_history)[-limit:]
+        
+        recent = list(islice(reversed(self.alerts_history), limit))
+        recent.reverse()
+        return recent
     
     def get_alerts_for_conversation(self, conversation_id: str) -> List[Dict[str, Any]]:
         """
@@ -113,7 +212,4 @@ class AlertSystem:
         Returns:
             List of alerts for the conversation
         """
-        return [
-            alert for alert in self.alerts_history 
-            if alert.get("data_reference", {}).get("conversation_id") == conversation_id
-        ]
\ No newline at end of file
+        return list(self._alerts_by_conv.get(conversation_id, ()))
\ No newline at end of file
@@ -1,28 +1,152 @@
+import asyncio
+import httpx
 import requests
 import time
 import json
+import random
+import threading
 import uuid
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a request body, with orjson when it is available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Values orjson rejects (e.g. integers beyond 64 bits) go through json
+            pass
+    return json.dumps(value).encode()
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Constant trailing fields of the simulated response bodies; builders fill in the rest
+_CRM_DATA: Dict[str, Any] = {
+    "assigned_to": "Customer Relations",
+    "estimated_response_time": "4 hours"
+}
+_TICKETING_DATA: Dict[str, Any] = {
+    "queue": "General Support",
+    "estimated_response_time": "24 hours"
+}
+_COMPLIANCE_DATA: Dict[str, Any] = {
+    "compliance_officer": "Regulatory Team",
+    "review_deadline": "72 hours"
+}
+_RISK_RESPONDERS = ("Fraud Department", "Security Team")
+
+def _crm_response(endpoint: str, data: Dict[str, Any], short_id: str) -> Dict[str, Any]:
+    return {"case_id": f"CRM-{short_id}", "status": "created",
+            "priority": data.get("priority", "medium"), **_CRM_DATA}
+
+def _ticketing_response(endpoint: str, data: Dict[str, Any], short_id: str) -> Dict[str, Any]:
+    return {"ticket_id": f"TKT-{short_id}", "status": "open",
+            "priority": data.get("priority", "medium"), **_TICKETING_DATA}
+
+def _compliance_response(endpoint: str, data: Dict[str, Any], short_id: str) -> Dict[str, Any]:
+    return {"alert_id": f"COMP-{short_id}", "status": "under_review",
+            "priority": data.get("priority", "high"), **_COMPLIANCE_DATA}
+
+def _risk_alert_response(endpoint: str, data: Dict[str, Any], short_id: str) -> Dict[str, Any]:
+    return {"alert_id": f"RISK-{short_id}", "status": "triggered",
+            "risk_level": data.get("priority", "high"), "notification_sent": True,
+            "responders": list(_RISK_RESPONDERS)}
+
+def _generic_response(endpoint: str, data: Dict[str, Any], short_id: str) -> Dict[str, Any]:
+    return {
+        "id": f"GEN-{short_id}",
+        "status": "processed",
+        "message": f"Request to {endpoint} processed successfully"
+    }
+
+# Simulated body builder and status code per endpoint; anything else gets the generic response
+_RESPONSE_BUILDERS: Dict[str, Tuple[Callable[[str, Dict[str, Any], str], Dict[str, Any]], int]] = {
+    "crm": (_crm_response, 201),
+    "ticketing": (_ticketing_response, 201),
+    "compliance": (_compliance_response, 201),
+    "risk_alert": (_risk_alert_response, 201)
+}
+
+# Endpoint paths, shared read-only by every client
+_ENDPOINTS = MappingProxyType({
+    "crm": "/crm",
+    "ticketing": "/tickets",
+    "compliance": "/compliance",
+    "risk_alert": "/risk_alert",
+    "notification": "/notify",
+    "archive": "/archive"
+})
+
+# One requests session for the whole process, so clients share pooled connections
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+def _get_shared_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _shared_session
+    session = _shared_session
+    if session is None:
+        with _shared_session_lock:
+            session = _shared_session
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=32,
+                    pool_maxsize=64,
+                    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _shared_session = session
+    return session
+
+def close_shared_session() -> None:
+    """Close the process-wide session; the next real request opens a new one."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
+
 class APIClient:
     """
     Simulated API client for external service integration.
     Can be used in simulation mode (no actual API calls) or real API mode.
     """
     
-    def __init__(self, base_url: str = None, api_key: str = None, simulate: bool = True):
+    __slots__ = ("base_url", "api_key", "simulate", "simulate_latency_s", "simulate_jitter_s",
+                 "endpoints", "_headers", "_async_client")
+    
+    def __init__(self, base_url: str = None, api_key: str = None, simulate: bool = True,
+                 simulate_latency_s: float = 0.0, simulate_jitter_s: float = 0.0):
         self.base_url = base_url or "https://api.example.com"
         self.api_key = api_key or "simulation-key"
         self.simulate = simulate
-        self.endpoints = {
-            "crm": "/crm",
-            "ticketing": "/tickets",
-            "compliance": "/compliance",
-            "risk_alert": "/risk_alert",
-            "notification": "/notify",
-            "archive": "/archive"
+        # Artificial network latency for simulated calls; 0 disables it.
+        # Jitter is the standard deviation of a Gaussian added on top.
+        self.simulate_latency_s = simulate_latency_s
+        self.simulate_jitter_s = simulate_jitter_s
+        self.endpoints = _ENDPOINTS
+        # Sent with each request; the connection pool itself is shared across clients
+        self._headers = {
+            "Content-Type": "application/json",
+            "X-API-Key": self.api_key,
+            "User-Agent": "MultiAgentSystem/1.0"
         }
+        # Used by post_many; created on first use
+        self._async_client: Optional[httpx.AsyncClient] = None
+    
+    def _url(self, endpoint: str) -> str:
+        return f"{self.base_url}{self.endpoints.get(endpoint, '/api')}"
     
     def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -39,35 +163,73 @@ class APIClient:
             return self._simulate_response(endpoint, data)
         
         try:
-            url = f"{self.base_url}{self.endpoints.get(endpoint, '/api')}"
-            headers = {
-                "Content-Type": "application/json",
-                "X-API-Key": self.api_key,
-                "User-Agent": "MultiAgentSystem/1.0"
-            }
+            response = _get_shared_session().post(
+                self._url(endpoint), headers=self._headers, data=_dumps(data), timeout=10
+            )
+            return self._wrap_response(response)
+        except Exception as e:
+            return self._wrap_error(e)
+    
+    async def post_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Send several POST requests concurrently over one connection pool.
+        
+        Args:
+            items: (endpoint, data) pairs
             
-            response = requests.post(
-                url,
-                headers=headers,
-                json=data,
+        Returns:
+            Response data for each item, in the same order
+        """
+        if self.simulate:
+            return await asyncio.gather(*(self._simulate_response_async(endpoint, data) for endpoint, data in items))
+        
+        client = self._get_async_client()
+        
+        async def send(endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                return self._wrap_response(await client.post(self._url(endpoint), content=_dumps(data)))
+            except Exception as e:
+                return self._wrap_error(e)
+        
+        return await asyncio.gather(*(send(endpoint, data) for endpoint, data in items))
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Return the async client, creating it on first use. It is bound to the
+        running event loop, so it must be closed with aclose() on that loop.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                headers=self._headers,
+                limits=httpx.Limits(max_keepalive_connections=64),
                 timeout=10
             )
-            
-            return {
-                "success": response.status_code in [200, 201, 202],
-                "status_code": response.status_code,
-                "data": response.json() if response.text else {},
-                "headers": dict(response.headers),
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "error_type": type(e).__name__,
-                "timestamp": datetime.now().isoformat()
-            }
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP client's connections."""
+        if self._async_client is not None:
+            client, self._async_client = self._async_client, None
+            await client.aclose()
+    
+    @staticmethod
+    def _wrap_response(response) -> Dict[str, Any]:
+        return {
+            "success": response.status_code in [200, 201, 202],
+            "status_code": response.status_code,
+            "data": _loads(response.content) if response.content else {},
+            "headers": dict(response.headers),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _wrap_error(e: Exception) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "timestamp": datetime.now().isoformat()
+        }
     
     def _simulate_response(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -80,88 +242,42 @@ class APIClient:
         Returns:
             Simulated response
         """
-        # Add realistic delay
-        time.sleep(0.3)
+        # Optionally add a delay to simulate network latency
+        delay = self._simulated_delay()
+        if delay:
+            time.sleep(delay)
         
+        return self._build_simulated_response(endpoint, data)
+    
+    async def _simulate_response_async(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _simulate_response; the delay does not block the event loop."""
+        delay = self._simulated_delay()
+        if delay:
+            await asyncio.sleep(delay)
+        
+        return self._build_simulated_response(endpoint, data)
+    
+    def _simulated_delay(self) -> float:
+        """Seconds of artificial latency for one simulated call."""
+        delay = self.simulate_latency_s
+        if self.simulate_jitter_s:
+            delay = max(0.0, random.gauss(delay, self.simulate_jitter_s))
+        return delay
+    
+    def _build_simulated_response(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the mock response for a simulated call."""
         # Generate request ID
-        request_id = str(uuid.uuid4())
+        full_id = uuid.uuid4()
+        request_id = str(full_id)
+        short_id = full_id.hex[:8]
+        timestamp = datetime.now().isoformat()
         
-        # Build custom response based on endpoint
-        if endpoint == "crm":
-            return {
-                "success": True,
-                "status_code": 201,
-                "data": {
-                    "case_id": f"CRM-{request_id[:8]}",
-                    "status": "created",
-                    "priority": data.get("priority", "medium"),
-                    "assigned_to": "Customer Relations",
-                    "estimated_response_time": "4 hours"
-                },
-                "request_id": request_id,
-                "timestamp": datetime.now().isoformat(),
-                "simulated": True
-            }
-            
-        elif endpoint == "ticketing":
-            return {
-                "success": True,
-                "status_code": 201,
-                "data": {
-                    "ticket_id": f"TKT-{request_id[:8]}",
-                    "status": "open",
-                    "priority": data.get("priority", "medium"),
-                    "queue": "General Support",
-                    "estimated_response_time": "24 hours"
-                },
-                "request_id": request_id,
-                "timestamp": datetime.now().isoformat(),
-                "simulated": True
-            }
-            
-        elif endpoint == "compliance":
-            return {
-                "success": True,
-                "status_code": 201,
-                "data": {
-                    "alert_id": f"COMP-{request_id[:8]}",
-                    "status": "under_review",
-                    "priority": data.get("priority", "high"),
-                    "compliance_officer": "Regulatory Team",
-                    "review_deadline": "72 hours"
-                },
-                "request_id": request_id,
-                "timestamp": datetime.now().isoformat(),
-                "simulated": True
-            }
-            
-        elif endpoint == "risk_alert":
-            return {
-                "success": True,
-                "status_code": 201,
-                "data": {
-                    "alert_id": f"RISK-{request_id[:8]}",
-                    "status": "triggered",
-                    "risk_level": data.get("priority", "high"),
-                    "notification_sent": True,
-                    "responders": ["Fraud Department", "Security Team"]
-                },
-                "request_id": request_id,
-                "timestamp": datetime.now().isoformat(),
-                "simulated": True
-            }
-            
-        else:
-            # Generic response for other endpoints
-            return {
-                "success": True,
-                "status_code": 200,
-                "data": {
-                    "id": f"GEN-{request_id[:8]}",
-                    "status": "processed",
-                    "message": f"Request to {endpoint} processed successfully"
-                },
-                "request_id": request_id,
-                "timestamp": datetime.now().isoformat(),
-                "simulated": True
-            }
\ No newline at end of file
+        builder, status_code = _RESPONSE_BUILDERS.get(endpoint, (_generic_response, 200))
+        return {
+            "success": True,
+            "status_code": status_code,
+            "data": builder(endpoint, data, short_id),
+            "request_id": request_id,
+            "timestamp": timestamp,
+            "simulated": True
+        }
@@ -0,0 +1,42 @@
+from typing import Dict, Any, List, NamedTuple, Optional
+
+class ResultView(NamedTuple):
+    """
+    Fields of a processing result that the summary generator, alert system and
+    action chains all read. Built once per request so each consumer does not
+    re-walk the nested result dict. Missing values are None.
+    """
+    format: Optional[str]
+    intent: Optional[str]
+    processed_data: Dict[str, Any]
+    urgency: Optional[str]
+    total_amount: Any
+    anomalies: Optional[List[Any]]
+    conversation_id: Optional[str]
+
+def extract_views(result: Dict[str, Any]) -> ResultView:
+    """
+    Extract the shared views from a processing result.
+
+    Args:
+        result: Result dict as assembled by /process
+
+    Returns:
+        ResultView over the result
+    """
+    processed_data = result.get("processed_data")
+    if not isinstance(processed_data, dict):
+        processed_data = {}
+
+    flowbit_data = processed_data.get("flowbit_data")
+    total_amount = flowbit_data.get("total_amount") if isinstance(flowbit_data, dict) else None
+
+    return ResultView(
+        format=result.get("format"),
+        intent=result.get("intent"),
+        processed_data=processed_data,
+        urgency=processed_data.get("urgency"),
+        total_amount=total_amount,
+        anomalies=processed_data.get("anomalies"),
+        conversation_id=result.get("conversation_id")
+    )
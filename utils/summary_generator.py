@@ -1,10 +1,13 @@
 from typing import Dict, Any, List, Optional
 import re
-import json
+
+from utils.result_view import ResultView
 
 class SummaryGenerator:
     """Generate concise summaries of processed content."""
     
+    __slots__ = ()
+    
     def __init__(self):
         pass
     
@@ -18,11 +21,7 @@ class SummaryGenerator:
         intent = email_data.get("intent", "Unknown")
         urgency = email_data.get("urgency", "Low")
         
-        summary = f"Email from {sender} ({sender_email})\n"
-        summary += f"Intent: {intent}\n"
-        summary += f"Urgency: {urgency}\n"
-        
-        return summary
+        return f"Email from {sender} ({sender_email})\nIntent: {intent}\nUrgency: {urgency}\n"
     
     def generate_json_summary(self, json_data: Dict[str, Any]) -> str:
         """Generate summary for JSON content."""
@@ -39,13 +38,15 @@ class SummaryGenerator:
         currency = flowbit_data.get("currency", "USD")
         anomaly_count = len(anomalies)
         
-        summary = f"Order {order_id} from {customer}\n"
-        summary += f"Contains {item_count} items for {total_amount} {currency}\n"
+        parts = [
+            f"Order {order_id} from {customer}\n",
+            f"Contains {item_count} items for {total_amount} {currency}\n"
+        ]
         
         if anomaly_count > 0:
-            summary += f"Detected {anomaly_count} anomalies\n"
+            parts.append(f"Detected {anomaly_count} anomalies\n")
         
-        return summary
+        return "".join(parts)
     
     def generate_pdf_summary(self, pdf_data: Dict[str, Any]) -> str:
         """Generate summary for PDF content."""
@@ -55,28 +56,34 @@ class SummaryGenerator:
         doc_type = pdf_data.get("document_type", "Unknown document")
         has_tables = pdf_data.get("has_tables", False)
         text_length = pdf_data.get("text_length", 0)
-        snippet = pdf_data.get("text_snippet", "")[:100] + "..."
+        snippet = pdf_data.get("text_snippet", "")
+        if len(snippet) > 100:
+            snippet = snippet[:100] + "..."
         
-        summary = f"{doc_type.capitalize()} document ({text_length} chars)\n"
-        if has_tables:
-            summary += "Contains tabular data\n"
-        summary += f"Preview: {snippet}\n"
-        
-        return summary
+        tables_line = "Contains tabular data\n" if has_tables else ""
+        return f"{doc_type.capitalize()} document ({text_length} chars)\n{tables_line}Preview: {snippet}\n"
     
-    def generate_summary(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_summary(self, data: Dict[str, Any], ctx: Optional[ResultView] = None) -> Dict[str, Any]:
         """
         Generate a summary based on the content format and processed data.
         
         Args:
             data: Processed data including format and content-specific details
+            ctx: Optional precomputed view of data
             
         Returns:
             Dictionary containing summary information
         """
-        format_type = data.get("format", "Unknown")
-        intent = data.get("intent", "Unknown")
-        processed_data = data.get("processed_data", {})
+        if ctx is not None:
+            format_type = ctx.format if ctx.format is not None else "Unknown"
+            intent = ctx.intent if ctx.intent is not None else "Unknown"
+            processed_data = ctx.processed_data
+            conversation_id = ctx.conversation_id
+        else:
+            format_type = data.get("format", "Unknown")
+            intent = data.get("intent", "Unknown")
+            processed_data = data.get("processed_data", {})
+            conversation_id = data.get("conversation_id")
         
         summary_text = ""
         
@@ -93,7 +100,7 @@ class SummaryGenerator:
             "format": format_type,
             "intent": intent,
             "summary": summary_text,
-            "conversation_id": data.get("conversation_id")
+            "conversation_id": conversation_id
         }
     
     def generate_conversation_summary(self, history: List[Dict[str, Any]]) -> str:
@@ -109,31 +116,33 @@ class SummaryGenerator:
         if not history:
             return "No conversation history available."
         
-        formats = set()
-        intents = set()
+        # Dicts as ordered sets so formats and intents are listed in first-seen order
+        formats = {}
+        intents = {}
         
         for item in history:
-            if "format" in item and item["format"]:
-                formats.add(item["format"])
-            if "intent" in item and item["intent"]:
-                intents.add(item["intent"])
+            format_type = item.get("format")
+            if format_type:
+                formats[format_type] = None
+            intent = item.get("intent")
+            if intent:
+                intents[intent] = None
         
         events_count = len(history)
         formats_str = ", ".join(formats) if formats else "Unknown"
         intents_str = ", ".join(intents) if intents else "Unknown"
         
-        summary = f"Conversation with {events_count} events\n"
-        summary += f"Formats: {formats_str}\n"
-        summary += f"Intents: {intents_str}\n"
+        parts = [f"Conversation with {events_count} events\nFormats: {formats_str}\nIntents: {intents_str}\n"]
         
         if events_count > 0:
-            summary += "\nKey events:\n"
+            parts.append("\nKey events:\n")
             
-            # Add up to 3 key events
-            for i, item in enumerate(history[-3:]):
+            # Add up to 3 key events, indexing the tail instead of copying it
+            for index in range(max(0, events_count - 3), events_count):
+                item = history[index]
                 format_type = item.get("format", "Unknown")
                 intent = item.get("intent", "Unknown")
                 timestamp = item.get("timestamp", "").split("T")[0]
-                summary += f"- {timestamp}: {format_type} with {intent} intent\n"
+                parts.append(f"- {timestamp}: {format_type} with {intent} intent\n")
         
-        return summary
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
@@ -1,23 +1,45 @@
-def validate_json_structure(data, required_fields):
-    if not isinstance(data, dict):
-        return False, "Input data is not a valid JSON object."
-    
-    missing_fields = [field for field in required_fields if field not in data]
-    if missing_fields:
+import os
+import re
+from functools import lru_cache
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+
+def compile_json_validator(required_fields):
+    # The field set is built once, so a valid object costs one subset test;
+    # the ordered list of missing fields is only built on failure.
+    ordered_fields = tuple(required_fields)
+    field_set = frozenset(ordered_fields)
+
+    def validate(data):
+        if not isinstance(data, dict):
+            return False, "Input data is not a valid JSON object."
+        
+        if field_set <= data.keys():
+            return True, "JSON structure is valid."
+        
+        missing_fields = [field for field in ordered_fields if field not in data]
         return False, f"Missing required fields: {', '.join(missing_fields)}"
-    
-    return True, "JSON structure is valid."
+
+    return validate
+
+@lru_cache(maxsize=64)
+def _cached_json_validator(required_fields):
+    return compile_json_validator(required_fields)
+
+def validate_json_structure(data, required_fields):
+    return _cached_json_validator(tuple(required_fields))(data)
+
+def validate_json_batch(records, required_fields):
+    # One validator for the whole batch; map() keeps the per-record loop in C
+    return list(map(compile_json_validator(required_fields), records))
 
 def validate_email_format(email):
-    import re
-    email_regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-    if not re.match(email_regex, email):
+    if not _EMAIL_RE.match(email):
         return False, "Invalid email format."
     
     return True, "Email format is valid."
 
 def validate_pdf_file(file_path):
-    import os
     if not os.path.isfile(file_path) or not file_path.endswith('.pdf'):
         return False, "File is not a valid PDF."
     